@@ -1,20 +1,31 @@
-from starlette_sqlalchemy.collection import Collection
-from starlette_sqlalchemy.middleware import DbSessionMiddleware
-from starlette_sqlalchemy.pagination import Page, PageNumberPaginator, Paginator
+from starlette_sqlalchemy.cache import QueryCache
+from starlette_sqlalchemy.collection import Collection, ColumnarCollection, LazyCollection
+from starlette_sqlalchemy.middleware import DbSessionMiddleware, LazySession
+from starlette_sqlalchemy.pagination import KeysetPage, KeysetPaginator, Page, PageNumberPaginator, Paginator
 from starlette_sqlalchemy.query import MultipleResultsError, NoResultError, Query, query
 from starlette_sqlalchemy.repos import Repo, RepoError, RepoFilter
+from starlette_sqlalchemy.routing import RoutingSession, use_primary, use_replica
 
 __all__ = [
     "Query",
     "query",
+    "QueryCache",
     "NoResultError",
     "MultipleResultsError",
     "DbSessionMiddleware",
+    "LazySession",
+    "RoutingSession",
+    "use_replica",
+    "use_primary",
     "Page",
     "Paginator",
     "PageNumberPaginator",
+    "KeysetPage",
+    "KeysetPaginator",
     "Repo",
     "RepoFilter",
     "RepoError",
     "Collection",
+    "ColumnarCollection",
+    "LazyCollection",
 ]
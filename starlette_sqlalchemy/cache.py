@@ -0,0 +1,218 @@
+import abc
+import asyncio
+import collections
+import hashlib
+import pickle
+import time
+import typing
+
+import sqlalchemy as sa
+from sqlalchemy import event
+from sqlalchemy.engine import Result
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import ORMExecuteState, Session, UOWTransaction
+from sqlalchemy.orm.loading import merge_frozen_result
+from sqlalchemy.sql.util import find_tables
+
+from starlette_sqlalchemy.query import get_statement_key, Params
+
+_WRITTEN_TAGS_KEY = "starlette_sqlalchemy.cache.written_tags"
+
+
+class CacheBackend(abc.ABC):  # pragma: no cover
+    @abc.abstractmethod
+    async def get(self, key: str) -> bytes | None:
+        """Return cached value or None if the key is missing or expired."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def set(self, key: str, value: bytes, ttl: float, tags: typing.Collection[str]) -> None:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def invalidate_tags(self, tags: typing.Collection[str]) -> None:
+        """Remove all entries labeled with any of the tags."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def clear(self) -> None:
+        raise NotImplementedError
+
+
+class MemoryCacheBackend(CacheBackend):
+    """In-process LRU cache with per-entry TTL."""
+
+    def __init__(self, max_entries: int = 1024) -> None:
+        self.max_entries = max_entries
+        self._entries: collections.OrderedDict[str, tuple[float, bytes, typing.Collection[str]]] = (
+            collections.OrderedDict()
+        )
+        self._tags: dict[str, set[str]] = collections.defaultdict(set)
+
+    async def get(self, key: str) -> bytes | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value, _ = entry
+        if expires_at <= time.monotonic():
+            self._delete(key)
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: float, tags: typing.Collection[str]) -> None:
+        self._delete(key)
+        self._entries[key] = (time.monotonic() + ttl, value, tags)
+        for tag in tags:
+            self._tags[tag].add(key)
+
+        while len(self._entries) > self.max_entries:
+            self._delete(next(iter(self._entries)))
+
+    async def invalidate_tags(self, tags: typing.Collection[str]) -> None:
+        for tag in tags:
+            for key in self._tags.pop(tag, set()):
+                self._delete(key)
+
+    async def clear(self) -> None:
+        self._entries.clear()
+        self._tags.clear()
+
+    def _delete(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            for tag in entry[2]:
+                if keys := self._tags.get(tag):
+                    keys.discard(key)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class QueryCache:
+    """Cache query results across requests.
+
+    Entries are keyed by the compiled SQL and bound values and tagged with names of tables the statement reads.
+    When any session flushes changes (or executes INSERT/UPDATE/DELETE) to a table, entries tagged with it are removed,
+    and once more when the transaction commits. Sessions with uncommitted writes bypass the cache.
+    ORM objects are merged into the requesting session without a database round trip.
+    Cached objects are snapshots, don't rely on them for data that must be strictly up-to-date.
+
+    The cache listens to events of all sessions (`listen_to`), call `dispose` to stop listening.
+    """
+
+    def __init__(
+        self,
+        backend: CacheBackend | None = None,
+        ttl: float = 60,
+        listen_to: typing.Any = Session,
+    ) -> None:
+        self.backend = backend or MemoryCacheBackend()
+        self.ttl = ttl
+        self.listen_to = listen_to
+        self._invalidations: set[asyncio.Task[None]] = set()
+        self._listeners: list[tuple[str, typing.Callable[..., None]]] = [
+            ("after_flush", self._on_flush),
+            ("do_orm_execute", self._on_execute),
+            ("after_commit", self._on_commit),
+            ("after_rollback", self._on_rollback),
+        ]
+        for identifier, listener in self._listeners:
+            event.listen(listen_to, identifier, listener)
+
+    async def execute(
+        self, dbsession: AsyncSession, stmt: sa.Select[typing.Any], params: Params | None = None
+    ) -> Result[typing.Any]:
+        """Execute the statement or return the cached result."""
+        if self._invalidations:
+            await asyncio.gather(*self._invalidations)
+
+        if dbsession.info.get(_WRITTEN_TAGS_KEY) or dbsession.new or dbsession.dirty or dbsession.deleted:
+            # results may contain uncommitted data, that other sessions must not see,
+            # pending changes are autoflushed by the query
+            result: Result[typing.Any] = await dbsession.execute(stmt, params)
+            return result
+
+        key = self.make_key(dbsession, stmt, params)
+        if cached := await self.backend.get(key):
+            frozen = pickle.loads(cached)
+
+            def merge(session: Session) -> Result[typing.Any]:
+                merged = merge_frozen_result(session, stmt, frozen, load=False)  # type: ignore[no-untyped-call]
+                return typing.cast(Result[typing.Any], merged())
+
+            return await dbsession.run_sync(merge)
+
+        result = await dbsession.execute(stmt, params)
+        frozen = result.freeze()
+        await self.backend.set(key, pickle.dumps(frozen), self.ttl, self.get_tags(stmt))
+        return typing.cast(Result[typing.Any], frozen())
+
+    async def clear(self) -> None:
+        await self.backend.clear()
+
+    def make_key(self, dbsession: AsyncSession, stmt: sa.ClauseElement, params: Params | None = None) -> str:
+        """Return a key of the compiled statement, its loader options and execution options.
+
+        Loader options (like `selectinload`) and execution options don't change the SQL but change
+        what gets loaded, statements that differ only by them must not share an entry.
+        """
+        options = [
+            option._generate_cache_key() or repr(option)  # uncacheable options never match each other
+            for option in getattr(stmt, "_with_options", ())
+        ]
+        execution_options = sorted(getattr(stmt, "get_execution_options", dict)().items())
+        key = f"{get_statement_key(dbsession, stmt, params)}|{options!r}|{execution_options!r}"
+        return hashlib.sha256(key.encode()).hexdigest()
+
+    def get_tags(self, stmt: sa.ClauseElement) -> set[str]:
+        """Return names of tables the statement reads."""
+        return {table.fullname for table in find_tables(stmt)}
+
+    def dispose(self) -> None:
+        """Stop listening to session events."""
+        for identifier, listener in self._listeners:
+            event.remove(self.listen_to, identifier, listener)
+
+    def _on_flush(self, session: Session, flush_context: UOWTransaction) -> None:
+        tags = {
+            table.fullname
+            for instance in [*session.new, *session.dirty, *session.deleted]
+            for table in sa.inspect(instance).mapper.tables
+        }
+        self._on_write(session, tags)
+
+    def _on_execute(self, orm_execute_state: ORMExecuteState) -> None:
+        if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+            table = getattr(orm_execute_state.statement, "table", None)
+            if table is not None:
+                self._on_write(orm_execute_state.session, {table.fullname})
+
+    def _on_commit(self, session: Session) -> None:
+        # entries cached by other sessions between the flush and the commit contain old data
+        self._invalidate(session.info.pop(_WRITTEN_TAGS_KEY, set()))
+
+    def _on_rollback(self, session: Session) -> None:
+        session.info.pop(_WRITTEN_TAGS_KEY, None)
+
+    def _on_write(self, session: Session, tags: set[str]) -> None:
+        if tags:
+            session.info.setdefault(_WRITTEN_TAGS_KEY, set()).update(tags)
+            self._invalidate(tags)
+
+    def _invalidate(self, tags: set[str]) -> None:
+        if not tags:
+            return
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:  # flushed by a synchronous session
+            asyncio.run(self.backend.invalidate_tags(tags))
+            return
+
+        # session events are synchronous, run invalidation as a task, cache reads wait for it
+        task = loop.create_task(self.backend.invalidate_tags(tags))
+        self._invalidations.add(task)
+        task.add_done_callback(self._invalidations.discard)
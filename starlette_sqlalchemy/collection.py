@@ -1,7 +1,10 @@
 from __future__ import annotations
 
+import array
 import functools
+import importlib
 import itertools
+import sys
 import typing
 
 E = typing.TypeVar("E")
@@ -35,11 +38,65 @@ def attribute_reader(
     return getattr(obj, attr, default)
 
 
+class SequenceView(typing.Sequence[E]):
+    """A read-only window into a list, slicing the view creates another view without copying items.
+
+    The view reflects changes of the underlying list.
+    """
+
+    __slots__ = ("_items", "_range")
+
+    def __init__(self, items: typing.Sequence[E], indices: range | None = None) -> None:
+        self._items = items
+        self._range = range(len(items)) if indices is None else indices
+
+    @typing.overload
+    def __getitem__(self, index: int) -> E:  # pragma: no cover
+        ...
+
+    @typing.overload
+    def __getitem__(self, index: slice) -> SequenceView[E]:  # pragma: no cover
+        ...
+
+    def __getitem__(self, index: int | slice) -> E | SequenceView[E]:
+        if isinstance(index, slice):
+            return SequenceView(self._items, self._range[index])
+        return self._items[self._range[index]]
+
+    def __len__(self) -> int:
+        return len(self._range)
+
+    def __iter__(self) -> typing.Iterator[E]:
+        # indexing jumps to the first item, islice would walk through all items before it
+        return map(self._items.__getitem__, self._range)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (typing.Sequence, Collection)) and not isinstance(other, (str, bytes)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"SequenceView({list(self)!r})"
+
+
 class Collection(typing.Generic[E]):
+    __slots__ = ("_position", "_indexes", "items")
+
     def __init__(self, items: typing.Iterable[E] | None = None) -> None:
         self._position = 0
+        self._indexes: dict[str, dict[typing.Any, E]] = {}
         self.items = list(items or [])
 
+    @classmethod
+    def wrap(cls, items: typing.Sequence[E]) -> Collection[E]:
+        """Create a collection that uses the list as its storage, without copying.
+        The caller must not modify the list afterwards. Other sequences are copied."""
+        collection = cls.__new__(cls)
+        collection._position = 0
+        collection._indexes = {}
+        collection.items = items if isinstance(items, list) else list(items)
+        return collection
+
     def first(self) -> E | None:
         """Return the first item from the collection."""
         try:
@@ -55,10 +112,38 @@ class Collection(typing.Generic[E]):
 
     def filter(self, fn: typing.Callable[[E], bool | None]) -> Collection[E]:
         """Filter collection items with `fn`."""
-        return Collection([item for item in self if fn(item)])
+        return Collection.wrap([item for item in self if fn(item)])
 
     def find(self, fn: typing.Callable[[E], bool | None]) -> E | None:
-        return self.filter(fn).first()
+        """Return the first item for which `fn` returns truthy value, stops at the first match."""
+        return next((item for item in self if fn(item)), None)
+
+    def find_by(self, key: typing.Callable[[E], typing.Any] | str, value: typing.Any) -> E | None:
+        """Return the item whose `key` equals `value`, for duplicate keys the last item wins.
+        Attribute names use the cached index, see `index_by`, callables scan the items."""
+        if isinstance(key, str):
+            return self.index_by(key).get(value)
+        return next((item for item in reversed(self.items) if key(item) == value), None)
+
+    def index_by(self, key: typing.Callable[[E], _KeyT] | str) -> dict[_KeyT, E]:
+        """Return a dict of key to item, for duplicate keys the last item wins.
+
+        Indexes by attribute name are built once and reused until the collection is modified
+        with item assignment or deletion. Don't modify the returned dict,
+        and don't modify `items` directly while using indexes. Indexes by callables are not cached.
+        """
+        if not isinstance(key, str):
+            return self._build_index(key)
+
+        index = self._indexes.get(key)
+        if index is None:
+            index = self._indexes[key] = self._build_index(key)
+        return index
+
+    def _build_index(self, key: typing.Callable[[E], _KeyT] | str) -> dict[_KeyT, E]:
+        if isinstance(key, str):
+            key = functools.partial(attribute_reader, attr=key)
+        return {key(item): item for item in self}
 
     def chunk(self, batch: int) -> typing.Generator[list[E], None, None]:
         """Split collection into chunks."""
@@ -67,24 +152,29 @@ class Collection(typing.Generic[E]):
     def pluck(self, key: str) -> Collection[typing.Any]:
         """Take a attribute/key named `key` from every item and return them in a new collection."""
         key = str(key)
-        return Collection([attribute_reader(item, key, None) for item in self])
+        return Collection.wrap([attribute_reader(item, key, None) for item in self])
 
     def reverse(self) -> Collection[E]:
         """Reverse collection."""
-        return Collection(reversed(self))
+        return Collection(reversed(self.items))
+
+    def lazy(self) -> LazyCollection[E]:
+        """Return a lazy pipeline over the items, see `LazyCollection`."""
+        return LazyCollection(self.items)
 
     def group_by(self, key: typing.Callable[[E], typing.Any] | str) -> dict[_KeyT, list[E]]:
+        """Group items by key, groups are ordered by the first appearance of the key."""
         if isinstance(key, str):
             key = functools.partial(attribute_reader, attr=key)
 
-        groups = itertools.groupby(sorted(self.items, key=key), key=key)
-        return {k: list(v) for k, v in groups}
+        groups: dict[_KeyT, list[E]] = {}
+        for item in self:
+            groups.setdefault(key(item), []).append(item)
+        return groups
 
     def key_value(self, key: typing.Callable[[E], _KeyT] | str) -> dict[_KeyT, E]:
-        if isinstance(key, str):
-            key = functools.partial(attribute_reader, attr=key)
-
-        return {key(item): item for item in self}
+        index = self._indexes.get(key) if isinstance(key, str) else None
+        return dict(index) if index is not None else self._build_index(key)
 
     def choices(
         self,
@@ -101,6 +191,14 @@ class Collection(typing.Generic[E]):
             for item in self
         ]
 
+    def view(self) -> SequenceView[E]:
+        """Return a read-only view of the items, slices of the view don't copy items.
+
+        Usage:
+            window = collection.view()[100:200]
+        """
+        return SequenceView(self.items)
+
     @typing.overload
     def __getitem__(self, index: slice) -> list[E]:  # pragma: no cover
         ...
@@ -110,14 +208,14 @@ class Collection(typing.Generic[E]):
         ...
 
     def __getitem__(self, index: int | slice) -> E | list[E]:
-        if isinstance(index, slice):
-            return list(self.items[index.start : index.stop : index.step])
         return self.items[index]
 
     def __setitem__(self, key: int, value: E) -> None:
+        self._indexes.clear()
         self.items.insert(key, value)
 
     def __delitem__(self, key: int) -> None:
+        self._indexes.clear()
         self.items.pop(key)
 
     def __len__(self) -> int:
@@ -138,7 +236,7 @@ class Collection(typing.Generic[E]):
         raise ValueError(f"{type(self)} and {type(other)} are not comparable.")
 
     def __reversed__(self) -> Collection[E]:
-        return Collection(reversed(list(self)))
+        return Collection(reversed(self.items))
 
     def __next__(self) -> E:
         if self._position < len(self):
@@ -156,3 +254,346 @@ class Collection(typing.Generic[E]):
 
     def __json__(self) -> list[E]:
         return list(self)
+
+
+_Step = tuple[str, typing.Any]
+
+
+async def _aiterate(items: typing.Iterable[typing.Any]) -> typing.Any:
+    for item in items:
+        yield item
+
+
+async def _aclose(items: typing.AsyncIterator[typing.Any]) -> None:
+    """Close the async iterator if it supports closing, for example, an async generator over a cursor."""
+    aclose = getattr(items, "aclose", None)
+    if aclose is not None:
+        await aclose()
+
+
+async def _afilter(
+    items: typing.AsyncIterator[typing.Any], fn: typing.Callable[[typing.Any], typing.Any]
+) -> typing.Any:
+    try:
+        async for item in items:
+            if fn(item):
+                yield item
+    finally:
+        await _aclose(items)
+
+
+async def _amap(items: typing.AsyncIterator[typing.Any], fn: typing.Callable[[typing.Any], typing.Any]) -> typing.Any:
+    try:
+        async for item in items:
+            yield fn(item)
+    finally:
+        await _aclose(items)
+
+
+async def _atake(items: typing.AsyncIterator[typing.Any], limit: int) -> typing.Any:
+    # the source is closed as soon as the limit is reached, without reading further rows
+    try:
+        if limit <= 0:
+            return
+        count = 0
+        async for item in items:
+            yield item
+            count += 1
+            if count >= limit:
+                return
+    finally:
+        await _aclose(items)
+
+
+async def _achunk(items: typing.AsyncIterator[typing.Any], size: int) -> typing.Any:
+    try:
+        result = []
+        async for item in items:
+            result.append(item)
+            if len(result) == size:
+                yield result
+                result = []
+
+        if len(result):
+            yield result
+    finally:
+        await _aclose(items)
+
+
+class LazyCollection(typing.Generic[E]):
+    """A chainable pipeline that runs only when consumed.
+
+    Every operation returns a new pipeline that composes generators over the source, nothing is copied.
+    The source can be a regular or an asynchronous iterable (like `Query.iterator`),
+    consume asynchronous pipelines with `async for` or `acollect()`.
+
+    Usage:
+        collection.lazy().filter(lambda user: user.is_active).pluck("email").chunk(100)
+        await LazyCollection(query.iterator(stmt)).filter(is_active).take(10).acollect()
+    """
+
+    __slots__ = ("source", "steps")
+
+    def __init__(
+        self, source: typing.Iterable[E] | typing.AsyncIterable[E], steps: typing.Sequence[_Step] = ()
+    ) -> None:
+        self.source = source
+        self.steps = tuple(steps)
+
+    @property
+    def is_async(self) -> bool:
+        return isinstance(self.source, typing.AsyncIterable)
+
+    def filter(self, fn: typing.Callable[[E], bool | None]) -> LazyCollection[E]:
+        return LazyCollection(self.source, [*self.steps, ("filter", fn)])
+
+    def map(self, fn: typing.Callable[[E], _MapVT]) -> LazyCollection[_MapVT]:
+        return LazyCollection(self.source, [*self.steps, ("map", fn)])  # type: ignore[arg-type]
+
+    def pluck(self, key: str) -> LazyCollection[typing.Any]:
+        """Take a attribute/key named `key` from every item."""
+        return self.map(functools.partial(attribute_reader, attr=str(key)))
+
+    def take(self, limit: int) -> LazyCollection[E]:
+        """Stop after `limit` items."""
+        return LazyCollection(self.source, [*self.steps, ("take", limit)])
+
+    def chunk(self, size: int) -> LazyCollection[list[E]]:
+        """Group items into lists of `size` items."""
+        return LazyCollection(self.source, [*self.steps, ("chunk", size)])  # type: ignore[arg-type]
+
+    def collect(self) -> Collection[E]:
+        """Run the pipeline and return the results as a collection."""
+        return Collection(self)
+
+    def first(self) -> E | None:
+        return next(iter(self), None)
+
+    async def acollect(self) -> Collection[E]:
+        """Run the pipeline (with sync or async source) and return the results as a collection."""
+        return Collection.wrap([item async for item in self])
+
+    async def afirst(self) -> E | None:
+        """Return the first item or None, the source is closed afterwards."""
+        items = aiter(self.take(1))
+        try:
+            async for item in items:
+                return item
+            return None
+        finally:
+            await _aclose(items)
+
+    def __iter__(self) -> typing.Iterator[E]:
+        if self.is_async:
+            raise TypeError("The pipeline has an asynchronous source, use `async for` or `acollect()`.")
+
+        items: typing.Iterator[typing.Any] = iter(typing.cast(typing.Iterable[E], self.source))
+        for name, arg in self.steps:
+            if name == "filter":
+                items = filter(arg, items)
+            elif name == "map":
+                items = map(arg, items)
+            elif name == "take":
+                items = itertools.islice(items, max(arg, 0))
+            elif name == "chunk":
+                items = chunked(items, arg)
+        return items
+
+    def __aiter__(self) -> typing.AsyncIterator[E]:
+        items: typing.AsyncIterator[typing.Any]
+        if self.is_async:
+            items = aiter(typing.cast(typing.AsyncIterable[E], self.source))
+        else:
+            items = _aiterate(typing.cast(typing.Iterable[E], self.source))
+
+        for name, arg in self.steps:
+            if name == "filter":
+                items = _afilter(items, arg)
+            elif name == "map":
+                items = _amap(items, arg)
+            elif name == "take":
+                items = _atake(items, arg)
+            elif name == "chunk":
+                items = _achunk(items, arg)
+        return items
+
+    def __repr__(self) -> str:
+        steps = ".".join(name for name, _ in self.steps)
+        return f"<LazyCollection: {steps or 'source'}>"
+
+
+@functools.cache
+def _get_numpy() -> typing.Any:
+    """Import NumPy on first use of columnar results, return None if it is not installed."""
+    try:
+        return importlib.import_module("numpy")
+    except ImportError:  # pragma: no cover
+        return None
+
+
+def _to_column(values: typing.Sequence[typing.Any], use_numpy: bool) -> typing.Any:
+    types = set(map(type, values))
+    numeric = bool(types) and types <= {int, float}
+    if use_numpy:
+        numpy = importlib.import_module("numpy")
+        if numeric:
+            return numpy.asarray(values)
+        column = numpy.empty(len(values), dtype=object)
+        column[:] = values
+        return column
+
+    if types == {int}:
+        try:
+            return array.array("q", values)
+        except OverflowError:
+            return list(values)
+    if numeric:
+        return array.array("d", values)
+    return list(values)
+
+
+def _is_ndarray(value: typing.Any) -> bool:
+    # arrays can exist only if NumPy has been imported already
+    numpy = sys.modules.get("numpy")
+    return numpy is not None and isinstance(value, numpy.ndarray)
+
+
+def _non_null(column: typing.Any) -> typing.Any:
+    """Return the column without None values, numeric arrays never contain them."""
+    if _is_ndarray(column):
+        # compares every item with None, "is not None" would compare the array itself
+        return column[column != None] if column.dtype == object else column  # noqa: E711
+    if isinstance(column, array.array):
+        return column
+    return [value for value in column if value is not None]
+
+
+def _take(column: typing.Any, indices: typing.Sequence[int]) -> typing.Any:
+    if _is_ndarray(column):
+        numpy = sys.modules["numpy"]
+        return column[numpy.asarray(indices, dtype=numpy.intp)]
+    if isinstance(column, array.array):
+        return array.array(column.typecode, [column[index] for index in indices])
+    return [column[index] for index in indices]
+
+
+def _scalar(value: typing.Any) -> typing.Any:
+    """Convert NumPy scalars into Python values."""
+    numpy = sys.modules.get("numpy")
+    return value.item() if numpy is not None and isinstance(value, numpy.generic) else value
+
+
+class ColumnarCollection:
+    """A read-only collection that stores every column as a contiguous array.
+
+    Numeric columns are kept in `array.array` (or NumPy arrays when NumPy is installed),
+    other columns (including numeric columns with NULLs) in lists. Aggregates skip None values, as SQL does.
+    Operations work on whole columns instead of reading attributes of every item,
+    which is much cheaper for large result sets.
+
+    Usage:
+        stats = await query.columnar(sa.select(Order.customer_id, Order.total))
+        stats.sum("total")
+        stats.group_by("customer_id")[1].mean("total")
+        stats.filter(stats.column("total") > 100)  # with NumPy
+    """
+
+    __slots__ = ("columns", "_length")
+
+    def __init__(self, columns: typing.Mapping[str, typing.Any]) -> None:
+        self.columns = dict(columns)
+        self._length = len(next(iter(self.columns.values()))) if self.columns else 0
+
+    @classmethod
+    def from_rows(
+        cls,
+        keys: typing.Sequence[str],
+        rows: typing.Iterable[typing.Sequence[typing.Any]],
+        use_numpy: bool | None = None,
+    ) -> ColumnarCollection:
+        """Build columns from result rows.
+
+        :param use_numpy: store columns as NumPy arrays, default is to use NumPy when installed
+        """
+        if use_numpy is None:
+            use_numpy = _get_numpy() is not None
+
+        values = list(zip(*rows)) or [() for _ in keys]
+        return cls({key: _to_column(column, use_numpy) for key, column in zip(keys, values)})
+
+    def keys(self) -> list[str]:
+        return list(self.columns)
+
+    def column(self, name: str) -> typing.Any:
+        """Return the column array."""
+        return self.columns[name]
+
+    def pluck(self, name: str) -> Collection[typing.Any]:
+        """Return values of the column as a collection."""
+        column = self.columns[name]
+        return Collection(column.tolist() if _is_ndarray(column) else column)
+
+    def filter(self, mask: typing.Iterable[typing.Any]) -> ColumnarCollection:
+        """Return rows where the mask is truthy, the mask has one item per row (for example, a NumPy bool array)."""
+        if _is_ndarray(mask):
+            return self.take(sys.modules["numpy"].flatnonzero(mask))
+        return self.take([index for index, selected in enumerate(mask) if selected])
+
+    def where(self, name: str, fn: typing.Callable[[typing.Any], typing.Any]) -> ColumnarCollection:
+        """Return rows for which `fn` returns truthy value for the column."""
+        return self.filter(map(fn, self.columns[name]))
+
+    def take(self, indices: typing.Sequence[int]) -> ColumnarCollection:
+        """Return rows with given indices."""
+        return ColumnarCollection({key: _take(column, indices) for key, column in self.columns.items()})
+
+    def group_by(self, name: str) -> dict[typing.Any, ColumnarCollection]:
+        """Split rows into groups by values of the column, in the order of the first appearance."""
+        groups: dict[typing.Any, list[int]] = {}
+        for index, value in enumerate(self.columns[name]):
+            groups.setdefault(_scalar(value), []).append(index)
+        return {key: self.take(indices) for key, indices in groups.items()}
+
+    def sum(self, name: str) -> typing.Any:
+        column = _non_null(self.columns[name])
+        return _scalar(column.sum()) if _is_ndarray(column) else sum(column)
+
+    def min(self, name: str) -> typing.Any:
+        column = _non_null(self.columns[name])
+        if not len(column):
+            return None
+        return _scalar(column.min()) if _is_ndarray(column) else min(column)
+
+    def max(self, name: str) -> typing.Any:
+        column = _non_null(self.columns[name])
+        if not len(column):
+            return None
+        return _scalar(column.max()) if _is_ndarray(column) else max(column)
+
+    def mean(self, name: str) -> float | None:
+        column = _non_null(self.columns[name])
+        if not len(column):
+            return None
+        total = _scalar(column.sum()) if _is_ndarray(column) else sum(column)
+        return float(total) / len(column)
+
+    def key_value(self, key: str, value: str) -> dict[typing.Any, typing.Any]:
+        return {_scalar(k): _scalar(v) for k, v in zip(self.columns[key], self.columns[value])}
+
+    def choices(self, label_attr: str = "name", value_attr: str = "id") -> list[tuple[typing.Any, typing.Any]]:
+        return [(_scalar(v), _scalar(k)) for v, k in zip(self.columns[value_attr], self.columns[label_attr])]
+
+    def to_collection(self) -> Collection[dict[str, typing.Any]]:
+        """Convert into a collection of dicts."""
+        return Collection(self)
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __iter__(self) -> typing.Iterator[dict[str, typing.Any]]:
+        keys = list(self.columns)
+        for values in zip(*self.columns.values()):
+            yield dict(zip(keys, map(_scalar, values)))
+
+    def __str__(self) -> str:
+        return f"<ColumnarCollection: columns={self.keys()}, rows={len(self)}>"
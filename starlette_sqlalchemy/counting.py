@@ -0,0 +1,122 @@
+import abc
+import json
+import time
+import typing
+
+import sqlalchemy as sa
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext import compiler
+from sqlalchemy.sql.compiler import SQLCompiler
+
+from starlette_sqlalchemy.query import get_statement_key, query
+
+
+_CompileFn = typing.Callable[..., str]
+
+# `compiles` has no annotations
+_compiles: typing.Callable[..., typing.Callable[[_CompileFn], _CompileFn]] = compiler.compiles
+
+
+class CountResult(typing.NamedTuple):
+    total: int
+    exact: bool = True
+
+
+class BaseCountStrategy(abc.ABC):  # pragma: no cover
+    @abc.abstractmethod
+    async def count(self, dbsession: AsyncSession, stmt: sa.Select[typing.Any]) -> CountResult:
+        raise NotImplementedError
+
+
+class ExactCount(BaseCountStrategy):
+    """Count rows with `SELECT count(*) FROM (subquery)`."""
+
+    async def count(self, dbsession: AsyncSession, stmt: sa.Select[typing.Any]) -> CountResult:
+        return CountResult(await query(dbsession).count(stmt))
+
+
+class CachedCount(BaseCountStrategy):
+    """Cache results of another strategy for `ttl` seconds.
+    The cache key is the compiled statement with its bound values."""
+
+    def __init__(self, strategy: BaseCountStrategy | None = None, ttl: float = 60, max_entries: int = 1024) -> None:
+        self.strategy = strategy or ExactCount()
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: dict[str, tuple[float, CountResult]] = {}
+
+    async def count(self, dbsession: AsyncSession, stmt: sa.Select[typing.Any]) -> CountResult:
+        key = get_statement_key(dbsession, stmt)
+        now = time.monotonic()
+        if entry := self._entries.get(key):
+            expires_at, result = entry
+            if expires_at > now:
+                return result
+            del self._entries[key]
+
+        result = await self.strategy.count(dbsession, stmt)
+        if len(self._entries) >= self.max_entries:
+            # dicts preserve insertion order, drop the oldest entry
+            del self._entries[next(iter(self._entries))]
+        self._entries[key] = (now + self.ttl, result)
+        return result
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+class _Explain(sa.Executable, sa.ClauseElement):
+    inherit_cache = False
+
+    def __init__(self, statement: sa.Select[typing.Any]) -> None:
+        self.statement = statement
+
+
+@_compiles(_Explain, "postgresql")
+def _compile_explain(element: _Explain, compiler: SQLCompiler, **kwargs: typing.Any) -> str:
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kwargs)
+
+
+class EstimatedCount(BaseCountStrategy):
+    """Use the query planner row estimate instead of counting rows.
+
+    Supported on PostgreSQL only, other databases fall back to `fallback` strategy.
+    When the estimate is below `exact_below`, the exact count is used,
+    because small counts are cheap and estimates are least accurate there.
+    """
+
+    def __init__(self, exact_below: int = 1000, fallback: BaseCountStrategy | None = None) -> None:
+        self.exact_below = exact_below
+        self.fallback = fallback or ExactCount()
+
+    async def count(self, dbsession: AsyncSession, stmt: sa.Select[typing.Any]) -> CountResult:
+        if dbsession.get_bind().dialect.name != "postgresql":
+            return await self.fallback.count(dbsession, stmt)
+
+        result = await dbsession.execute(_Explain(stmt))
+        plan = result.scalar_one()
+        if isinstance(plan, (str, bytes)):
+            plan = json.loads(plan)
+
+        estimate = int(plan[0]["Plan"]["Plan Rows"])
+        if estimate < self.exact_below:
+            return await self.fallback.count(dbsession, stmt)
+        return CountResult(estimate, exact=False)
+
+
+class CappedCount(BaseCountStrategy):
+    """Count at most `limit` rows.
+
+    Uses `LIMIT limit + 1` inside the count subquery, so the database stops scanning early.
+    The statement is wrapped into a subquery first, so its own LIMIT and OFFSET are respected.
+    If there are more rows than the limit, the result is inexact (displayed as "1000+").
+    """
+
+    def __init__(self, limit: int = 1000) -> None:
+        self.limit = limit
+
+    async def count(self, dbsession: AsyncSession, stmt: sa.Select[typing.Any]) -> CountResult:
+        total = await query(dbsession).count(sa.select(stmt.subquery()).limit(self.limit + 1))
+        if total > self.limit:
+            return CountResult(self.limit, exact=False)
+        return CountResult(total)
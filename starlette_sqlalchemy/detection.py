@@ -0,0 +1,88 @@
+import logging
+import os
+import typing
+import warnings
+
+import sqlalchemy as sa
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import ORMExecuteState
+
+from starlette_sqlalchemy.instrumentation import get_call_site
+
+DETECTOR_KEY = "starlette_sqlalchemy.n_plus_one"
+DetectorMode = typing.Literal["log", "warn", "raise"]
+
+_SQLALCHEMY_DIR = os.path.dirname(os.path.abspath(sa.__file__)) + os.sep
+
+
+class NPlusOneError(Exception):
+    """Raised by `NPlusOneDetector` in "raise" mode."""
+
+
+class NPlusOneWarning(UserWarning):
+    """Issued by `NPlusOneDetector` in "warn" mode."""
+
+
+class NPlusOneDetector:
+    """Detect repeated lazy loads of the same relationship within a session.
+
+    Every lazy load that hits the database is fingerprinted by the loaded relationship and the statement shape.
+    When the same fingerprint repeats `threshold` times, the relationship is reported once per session
+    with the call site and the loader option that would batch the loads.
+
+    :param mode: "log" - log a warning, "warn" - issue `NPlusOneWarning`, "raise" - raise `NPlusOneError` (for tests)
+
+    Usage:
+        DbSessionMiddleware(app, session_factory, detector=NPlusOneDetector(mode="raise"))
+    """
+
+    def __init__(
+        self,
+        mode: DetectorMode = "warn",
+        threshold: int = 2,
+        logger: logging.Logger | None = None,
+    ) -> None:
+        self.mode = mode
+        self.threshold = threshold
+        self.logger = logger or logging.getLogger("starlette_sqlalchemy.n_plus_one")
+
+    def attach(self, dbsession: AsyncSession) -> None:
+        """Start watching lazy loads of the session."""
+        dbsession.info[DETECTOR_KEY] = {}
+        event.listen(dbsession.sync_session, "do_orm_execute", self._on_execute)
+
+    def detach(self, dbsession: AsyncSession) -> None:
+        if event.contains(dbsession.sync_session, "do_orm_execute", self._on_execute):
+            event.remove(dbsession.sync_session, "do_orm_execute", self._on_execute)
+        dbsession.info.pop(DETECTOR_KEY, None)
+
+    def _on_execute(self, orm_execute_state: ORMExecuteState) -> None:
+        path = orm_execute_state.loader_strategy_path
+        if orm_execute_state.lazy_loaded_from is None or path is None:
+            return
+
+        relationship = path.path[-1]
+        fingerprint = (relationship, str(orm_execute_state.statement))
+        counts: dict[typing.Any, int] = orm_execute_state.session.info.setdefault(DETECTOR_KEY, {})
+        counts[fingerprint] = counts.get(fingerprint, 0) + 1
+        if counts[fingerprint] == self.threshold:
+            self.report(self.format_message(relationship, counts[fingerprint]))
+
+    def format_message(self, relationship: typing.Any, count: int) -> str:
+        name = f"{relationship.parent.class_.__name__}.{relationship.key}"
+        option = "selectinload" if relationship.uselist else "joinedload"
+        call_site = get_call_site(skip=(_SQLALCHEMY_DIR,))
+        return (
+            f"Potential N+1 query: {name} was lazy loaded {count} times, at {call_site}. "
+            f"Load it eagerly with options=[{option}({name})], "
+            f"for example, repo.get(pk, options=[{option}({name})]) or stmt.options({option}({name}))."
+        )
+
+    def report(self, message: str) -> None:
+        if self.mode == "raise":
+            raise NPlusOneError(message)
+        if self.mode == "warn":
+            warnings.warn(message, NPlusOneWarning, stacklevel=2)
+        else:
+            self.logger.warning(message)
@@ -0,0 +1,191 @@
+import abc
+import asyncio
+import contextlib
+import contextvars
+import functools
+import hashlib
+import logging
+import os
+import sys
+import time
+import typing
+
+import sqlalchemy as sa
+from sqlalchemy.ext.asyncio import AsyncSession
+
+RECORDER_KEY = "starlette_sqlalchemy.recorder"
+
+_FnT = typing.TypeVar("_FnT", bound=typing.Callable[..., typing.Awaitable[typing.Any]])
+_source: contextvars.ContextVar[str | None] = contextvars.ContextVar("starlette_sqlalchemy.source", default=None)
+
+# the trailing separator keeps directories like "starlette_sqlalchemy_extra" from matching,
+# only stdlib modules between queries and callers are skipped, site-packages share the stdlib prefix
+_PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__)) + os.sep
+_SKIPPED_PATHS = (_PACKAGE_DIR, os.path.abspath(contextlib.__file__), os.path.dirname(asyncio.__file__) + os.sep)
+
+
+class QueryEvent(typing.NamedTuple):
+    method: str
+    """Query method name, for example "all"."""
+
+    source: str | None
+    """The repo method that made the call, for example "UserRepo.get"."""
+
+    fingerprint: str | None
+    """Short hash of the SQL text without bound values, equal for statements that differ only in parameters."""
+
+    statement: str | None
+    elapsed: float
+    """Seconds spent in the database call."""
+
+    rows: int | None
+    call_site: str | None
+    """The first caller outside of this package, as "path:line in function"."""
+
+
+class BaseSink(abc.ABC):  # pragma: no cover
+    """Receives every recorded event, implement to export metrics."""
+
+    @abc.abstractmethod
+    def record(self, event: QueryEvent) -> None:
+        raise NotImplementedError
+
+
+class LoggingSink(BaseSink):
+    """Log every event."""
+
+    def __init__(self, logger: logging.Logger | None = None, level: int = logging.DEBUG) -> None:
+        self.logger = logger or logging.getLogger("starlette_sqlalchemy.queries")
+        self.level = level
+
+    def record(self, event: QueryEvent) -> None:
+        self.logger.log(
+            self.level,
+            "%s: %.2fms, %s rows, at %s: %s",
+            f"{event.source}.{event.method}" if event.source else event.method,
+            event.elapsed * 1000,
+            event.rows,
+            event.call_site,
+            event.statement,
+        )
+
+
+class QueryRecorder:
+    """Collect query events of a session, usually one recorder per request.
+
+    `DbSessionMiddleware(instrument=True)` attaches a recorder to every request session,
+    use `attach` to record queries of other sessions.
+    """
+
+    def __init__(self, sinks: typing.Sequence[BaseSink] = (), capture_call_site: bool = True) -> None:
+        self.sinks = sinks
+        self.capture_call_site = capture_call_site
+        self.events: list[QueryEvent] = []
+
+    def attach(self, dbsession: AsyncSession) -> None:
+        dbsession.info[RECORDER_KEY] = self
+
+    def record(self, event: QueryEvent) -> None:
+        self.events.append(event)
+        for sink in self.sinks:
+            sink.record(event)
+
+    @property
+    def count(self) -> int:
+        """Number of recorded calls."""
+        return len(self.events)
+
+    @property
+    def elapsed(self) -> float:
+        """Total seconds spent in the database."""
+        return sum(event.elapsed for event in self.events)
+
+    @property
+    def rows(self) -> int:
+        """Total rows returned."""
+        return sum(event.rows or 0 for event in self.events)
+
+    def as_dict(self) -> dict[str, typing.Any]:
+        return {"count": self.count, "elapsed": self.elapsed, "rows": self.rows}
+
+    def server_timing(self, name: str = "db") -> str:
+        """Format totals as a `Server-Timing` header value."""
+        return f'{name};dur={self.elapsed * 1000:.2f};desc="{self.count} queries, {self.rows} rows"'
+
+    def __repr__(self) -> str:
+        return f"<QueryRecorder: count={self.count}, elapsed={self.elapsed:.4f}, rows={self.rows}>"
+
+
+class Measurement:
+    """Collects the number of rows while a call is being measured.
+    Set `elapsed` to report own timing instead of the time spent inside the `instrument` block."""
+
+    __slots__ = ("rows", "elapsed")
+
+    def __init__(self) -> None:
+        self.rows: int | None = None
+        self.elapsed: float | None = None
+
+
+def get_recorder(dbsession: AsyncSession) -> QueryRecorder | None:
+    return typing.cast(QueryRecorder | None, dbsession.info.get(RECORDER_KEY))
+
+
+def get_fingerprint(stmt: sa.ClauseElement) -> tuple[str, str]:
+    """Return the fingerprint and SQL text of the statement."""
+    sql = str(stmt)
+    return hashlib.sha1(sql.encode()).hexdigest()[:12], sql
+
+
+def get_call_site(skip: tuple[str, ...] = ()) -> str | None:
+    """Return the location of the first caller outside of this package and `skip` paths.
+
+    :param skip: prefixes of file paths to skip, end directory paths with `os.sep`
+    """
+    skipped = _SKIPPED_PATHS + skip
+    frame = sys._getframe(1)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if not filename.startswith(skipped):
+            return f"{filename}:{frame.f_lineno} in {frame.f_code.co_name}"
+        frame = frame.f_back  # type: ignore[assignment]
+    return None  # pragma: no cover
+
+
+@contextlib.contextmanager
+def instrument(
+    dbsession: AsyncSession, method: str, stmt: sa.ClauseElement | None = None
+) -> typing.Generator[Measurement, None, None]:
+    """Measure a database call and record it, if the session has a recorder. Set `rows` of the measurement."""
+    measurement = Measurement()
+    recorder = get_recorder(dbsession)
+    if recorder is None:
+        yield measurement
+        return
+
+    call_site = get_call_site() if recorder.capture_call_site else None
+    started = time.perf_counter()
+    try:
+        yield measurement
+    finally:
+        elapsed = time.perf_counter() - started if measurement.elapsed is None else measurement.elapsed
+        fingerprint, sql = get_fingerprint(stmt) if stmt is not None else (None, None)
+        recorder.record(QueryEvent(method, _source.get(), fingerprint, sql, elapsed, measurement.rows, call_site))
+
+
+def instrumented(fn: _FnT) -> _FnT:
+    """Attribute queries made by the repo method to it, see `QueryEvent.source`.
+    Nested calls keep the outermost method."""
+
+    @functools.wraps(fn)
+    async def wrapper(self: typing.Any, *args: typing.Any, **kwargs: typing.Any) -> typing.Any:
+        if _source.get() is not None:
+            return await fn(self, *args, **kwargs)
+
+        token = _source.set(f"{type(self).__name__}.{fn.__name__}")
+        try:
+            return await fn(self, *args, **kwargs)
+        finally:
+            _source.reset(token)
+
+    return typing.cast(_FnT, wrapper)
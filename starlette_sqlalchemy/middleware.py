@@ -1,7 +1,54 @@
+import contextlib
+import functools
+import types
 import typing
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from starlette.types import ASGIApp, Receive, Scope, Send
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from starlette_sqlalchemy.detection import NPlusOneDetector
+from starlette_sqlalchemy.instrumentation import BaseSink, QueryRecorder
+from starlette_sqlalchemy.routing import is_replica_request, READ_ONLY_KEY
+
+
+class LazySession:
+    """A session proxy that creates the session on first attribute access.
+
+    Requests that never touch the database do not pay for session construction and teardown.
+    """
+
+    def __init__(self, factory: typing.Callable[[], AsyncSession]) -> None:
+        self._factory = factory
+        self._session: AsyncSession | None = None
+
+    @property
+    def is_created(self) -> bool:
+        """Test if the underlying session has been created."""
+        return self._session is not None
+
+    def get_session(self) -> AsyncSession:
+        """Return the underlying session, create it if needed."""
+        if self._session is None:
+            self._session = self._factory()
+        return self._session
+
+    def __getattr__(self, name: str) -> typing.Any:
+        return getattr(self.get_session(), name)
+
+    def __repr__(self) -> str:
+        return f"<LazySession: created={self.is_created}>"
+
+
+TransactionMode = typing.Literal["manual", "autocommit", "rollback_on_error"]
+
+
+class _RequestContext:
+    def __init__(self, scope: Scope, stack: contextlib.AsyncExitStack) -> None:
+        self.scope = scope
+        self.stack = stack
+        self.dbsession: AsyncSession | None = None
+        self.status: int | None = None
+        self.recorder: QueryRecorder | None = None
 
 
 class DbSessionMiddleware:
@@ -10,13 +57,142 @@ class DbSessionMiddleware:
         app: ASGIApp,
         session_factory: typing.Callable[[], typing.AsyncContextManager[AsyncSession]],
         key: str = "dbsession",
+        lazy: bool = False,
+        scope_types: typing.Collection[str] | None = None,
+        release_on_response_start: bool = False,
+        read_methods: typing.Collection[str] = ("GET", "HEAD"),
+        transaction: TransactionMode = "manual",
+        instrument: bool = False,
+        sinks: typing.Sequence[BaseSink] = (),
+        server_timing: bool = False,
+        stats_key: str = "dbstats",
+        detector: NPlusOneDetector | None = None,
     ) -> None:
+        """
+        :param lazy: put a `LazySession` proxy into the state instead of the session,
+                     the session is created on first use and closed only if it was created.
+                     Requires `session_factory` that returns `AsyncSession`, like `async_sessionmaker`.
+        :param scope_types: ASGI scope types that get a session, for example ("http",).
+                            All scopes get a session when None.
+        :param release_on_response_start: close the session and return the connection to the pool
+                                          when "http.response.start" is sent, before the body streams.
+                                          The response body and background tasks should not use the session,
+                                          if they do, the session opens a new connection,
+                                          which is closed when the request exits.
+        :param read_methods: HTTP methods served by read replicas, requires `RoutingSession`.
+        :param transaction: how the middleware ends the session transaction:
+                            "manual" - endpoints commit themselves, uncommitted changes are discarded on close;
+                            "autocommit" - commit before the response is sent if the status is below 400,
+                            otherwise (or on exception) rollback;
+                            "rollback_on_error" - rollback on exception or 4xx/5xx status.
+                            Sessions without an active transaction are left alone, saving a round trip.
+        :param instrument: record calls of `Query` and `Repo` methods made with the request session,
+                           the `QueryRecorder` is available as `request.state.dbstats` (see `stats_key`).
+        :param sinks: receive every recorded event, for example, to export metrics. Implies `instrument`.
+        :param server_timing: add totals as the `Server-Timing` response header. Implies `instrument`.
+        :param detector: report N+1 lazy load patterns in the request session, see `NPlusOneDetector`.
+        """
         self.app = app
         self.key = key
+        self.lazy = lazy
+        self.scope_types = scope_types
+        self.release_on_response_start = release_on_response_start
+        self.read_methods = read_methods
+        self.transaction = transaction
         self.session_factory = session_factory
+        self.instrument = instrument or bool(sinks) or server_timing
+        self.sinks = sinks
+        self.server_timing = server_timing
+        self.stats_key = stats_key
+        self.detector = detector
 
     async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
-        async with self.session_factory() as dbsession:
+        if self.scope_types is not None and scope.get("type") not in self.scope_types:
+            await self.app(scope, receive, send)
+            return
+
+        async with contextlib.AsyncExitStack() as stack:
+            context = _RequestContext(scope, stack)
+            if self.instrument:
+                context.recorder = QueryRecorder(self.sinks)
+
+            dbsession: AsyncSession | LazySession
+            if self.lazy:
+                dbsession = LazySession(functools.partial(self._create_lazy_session, context))
+            else:
+                dbsession = await stack.enter_async_context(self.session_factory())
+                self._configure_session(context, dbsession)
+
             scope.setdefault("state", {})
             scope["state"][self.key] = dbsession
+            if context.recorder is not None:
+                scope["state"][self.stats_key] = context.recorder
+
+            if scope.get("type") == "http":
+                send = self._wrap_send(send, context)
             await self.app(scope, receive, send)
+
+    def _wrap_send(self, send: Send, context: _RequestContext) -> Send:
+        async def wrapped_send(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                context.status = message["status"]
+                if self.server_timing and context.recorder is not None:
+                    header = context.recorder.server_timing().encode("latin-1")
+                    message = {**message, "headers": [*message.get("headers", []), (b"server-timing", header)]}
+                if self.release_on_response_start:
+                    await context.stack.aclose()
+                    if context.dbsession is not None:
+                        # the body or background tasks may use the session again, close it once more on exit
+                        context.stack.push_async_callback(context.dbsession.close)
+                elif context.dbsession is not None:
+                    # finish the transaction before the client sees the response
+                    await self._end_transaction(context, failed=False)
+            await send(message)
+
+        return wrapped_send
+
+    async def _end_transaction(self, context: _RequestContext, failed: bool) -> None:
+        dbsession = context.dbsession
+        if self.transaction == "manual" or dbsession is None or not dbsession.in_transaction():
+            return
+
+        succeeded = not failed and (context.status is None or context.status < 400)
+        if succeeded and self.transaction == "autocommit":
+            await dbsession.commit()
+        elif not succeeded:
+            await dbsession.rollback()
+
+    async def _exit_transaction(
+        self,
+        context: _RequestContext,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: types.TracebackType | None,
+    ) -> None:
+        await self._end_transaction(context, failed=exc_type is not None)
+
+    def _configure_session(self, context: _RequestContext, dbsession: AsyncSession) -> None:
+        context.dbsession = dbsession
+
+        if context.recorder is not None:
+            context.recorder.attach(dbsession)
+
+        if self.detector is not None:
+            self.detector.attach(dbsession)
+            context.stack.callback(self.detector.detach, dbsession)
+
+        # evaluated on every statement because the endpoint is known only after routing
+        dbsession.info[READ_ONLY_KEY] = functools.partial(is_replica_request, context.scope, self.read_methods)
+
+        # exit callbacks run in reverse order, so the transaction ends before the session closes
+        context.stack.push_async_exit(functools.partial(self._exit_transaction, context))
+
+    def _create_lazy_session(self, context: _RequestContext) -> AsyncSession:
+        dbsession = self.session_factory()
+        if not isinstance(dbsession, AsyncSession):
+            raise TypeError("Lazy sessions require a session factory that returns AsyncSession instances.")
+
+        # AsyncSession.__aenter__ only returns self, exiting the context closes the session
+        context.stack.push_async_exit(dbsession)
+        self._configure_session(context, dbsession)
+        return dbsession
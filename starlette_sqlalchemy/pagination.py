@@ -1,15 +1,28 @@
 import abc
+import asyncio
+import base64
 import contextlib
+import datetime
+import decimal
+import json
 import math
 import typing
+import uuid
 
 import sqlalchemy as sa
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
 from starlette.requests import Request
 
-from starlette_sqlalchemy.query import query
+from starlette_sqlalchemy.counting import BaseCountStrategy, CountResult, ExactCount
+from starlette_sqlalchemy.query import query, SessionFactory
 
 T = typing.TypeVar("T")
+KeysetColumn = typing.Union[sa.ColumnElement[typing.Any], InstrumentedAttribute[typing.Any]]
+
+
+class CursorError(ValueError):
+    """Raised when a keyset pagination cursor cannot be decoded."""
 
 
 def get_page_value(request: Request, param_name: str = "page") -> int:
@@ -65,11 +78,20 @@ class SlidingStyle(BaseStyle):
 
 
 class Page(typing.Generic[T]):
+    __slots__ = ("rows", "total", "total_is_exact", "page", "page_size", "_style", "_pointer")
+
     def __init__(
-        self, items: typing.Sequence[T], total: int, page: int, page_size: int, style: BaseStyle | None = None
+        self,
+        items: typing.Sequence[T],
+        total: int,
+        page: int,
+        page_size: int,
+        style: BaseStyle | None = None,
+        total_is_exact: bool = True,
     ) -> None:
         self.rows = items
         self.total = total
+        self.total_is_exact = total_is_exact
         self.page = page
         self.page_size = page_size
         self._style = style or SlidingStyle()
@@ -82,7 +104,10 @@ class Page(typing.Generic[T]):
 
     @property
     def has_next(self) -> bool:
-        """Test if the next page is available."""
+        """Test if the next page is available.
+        When the total is not exact, a full page means there may be more rows."""
+        if not self.total_is_exact and len(self.rows) == self.page_size:
+            return True
         return self.page < self.total_pages
 
     @property
@@ -102,6 +127,8 @@ class Page(typing.Generic[T]):
 
         Always returns an integer. If there is no more pages the current page number returned.
         """
+        if not self.total_is_exact and self.has_next:
+            return self.page + 1
         return min(self.total_pages, self.page + 1)
 
     @property
@@ -149,8 +176,26 @@ class Page(typing.Generic[T]):
     def __bool__(self) -> bool:
         return len(self.rows) > 0
 
+    @property
+    def display_total(self) -> str:
+        """The total as a string, inexact totals are suffixed with "+" (e.g. "1000+")."""
+        return str(self.total) if self.total_is_exact else f"{self.total}+"
+
+    def __json__(self) -> dict[str, typing.Any]:
+        return {
+            "items": self.rows,
+            "total": self.total,
+            "total_is_exact": self.total_is_exact,
+            "page": self.page,
+            "page_size": self.page_size,
+            "total_pages": self.total_pages,
+            "has_next": self.has_next,
+            "has_previous": self.has_previous,
+        }
+
     def __str__(self) -> str:
-        return f"Page {self.page} of {self.total_pages}, rows {self.start_index} - {self.end_index} of {self.total}."
+        rows = f"rows {self.start_index} - {self.end_index} of {self.display_total}"
+        return f"Page {self.page} of {self.total_pages}, {rows}."
 
     def __repr__(self) -> str:
         return f"<Page: page={self.page}, total_pages={self.total_pages}>"
@@ -163,25 +208,105 @@ def _safe_int(value: str | int, fallback: int) -> int:
         return fallback
 
 
+def _is_distinct(stmt: sa.Select[typing.Any]) -> bool:
+    """Return True if the statement uses DISTINCT or DISTINCT ON.
+    SQLAlchemy has no public accessor for this, read the state `Select.distinct` sets, defaulting to False."""
+    return bool(getattr(stmt, "_distinct", False) or getattr(stmt, "_distinct_on", ()))
+
+
 class Paginator(abc.ABC):
     def __init__(self, dbsession: AsyncSession) -> None:
         self.dbsession = dbsession
 
 
+CountMode = typing.Literal["query", "window", "concurrent"]
+
+
 class PageNumberPaginator(Paginator):
+    """Offset based paginator.
+
+    The total row count can be obtained in several ways, controlled by `count_mode`:
+
+    * "query" - run a separate `SELECT count(*)` before fetching rows (default)
+    * "window" - fetch the total together with rows using `count(*) OVER ()`, one round trip.
+      DISTINCT statements fall back to "query".
+    * "concurrent" - run the count query on a second session from `session_factory`
+      while rows are fetched. Note, that the second session does not see uncommitted changes.
+
+    How the count query is computed is controlled by `count_strategy`, see `starlette_sqlalchemy.counting`.
+    """
+
+    def __init__(
+        self,
+        dbsession: AsyncSession,
+        count_mode: CountMode = "query",
+        session_factory: SessionFactory | None = None,
+        count_strategy: BaseCountStrategy | None = None,
+    ) -> None:
+        super().__init__(dbsession)
+        if count_mode == "concurrent" and session_factory is None:
+            raise ValueError('The "concurrent" count mode requires "session_factory".')
+
+        self.count_mode = count_mode
+        self.session_factory = session_factory
+        self.count_strategy = count_strategy or ExactCount()
+
     async def paginate(
         self, stmt: sa.Select[tuple[T]], page: int, page_size: int, style: BaseStyle | None = None
     ) -> Page[T]:
         offset = (page - 1) * page_size
-        total_rows = await self.count(stmt)
-
-        stmt = stmt.limit(page_size).offset(offset)
-        rows = await query(self.dbsession).all(stmt)
-
-        return Page(total=total_rows, items=list(rows), page=page, page_size=page_size, style=style)
+        # DISTINCT is applied after window functions, so the window would count duplicates
+        if self.count_mode == "window" and not _is_distinct(stmt):
+            rows, total = await self._fetch_with_window_count(stmt, page_size, offset)
+        elif self.count_mode == "concurrent":
+            rows, total = await self._fetch_with_concurrent_count(stmt, page_size, offset)
+        else:
+            total = await self.count_strategy.count(self.dbsession, stmt)
+            rows = (await query(self.dbsession).all(stmt.limit(page_size).offset(offset))).items
+
+        return Page(
+            total=total.total,
+            items=rows,
+            page=page,
+            page_size=page_size,
+            style=style,
+            total_is_exact=total.exact,
+        )
 
     async def count(self, stmt: sa.Select[tuple[T]]) -> int:
-        return await query(self.dbsession).count(stmt)
+        result = await self.count_strategy.count(self.dbsession, stmt)
+        return result.total
+
+    async def _fetch_with_window_count(
+        self, stmt: sa.Select[tuple[T]], page_size: int, offset: int
+    ) -> tuple[list[T], CountResult]:
+        total_column = sa.func.count().over().label("__pagination_total__")
+        windowed = stmt.add_columns(total_column).limit(page_size).offset(offset)
+        result = await self.dbsession.execute(windowed)
+        rows = result.all()
+        if rows:
+            return [row[0] for row in rows], CountResult(int(rows[0][-1]))
+
+        # the page is out of range, so the window function had no rows to report the total
+        if offset:
+            return [], await self.count_strategy.count(self.dbsession, stmt)
+        return [], CountResult(0)
+
+    async def _fetch_with_concurrent_count(
+        self, stmt: sa.Select[tuple[T]], page_size: int, offset: int
+    ) -> tuple[list[T], CountResult]:
+        assert self.session_factory is not None
+
+        async def count_in_new_session() -> CountResult:
+            assert self.session_factory is not None
+            async with self.session_factory() as dbsession:
+                return await self.count_strategy.count(dbsession, stmt)
+
+        total, rows = await asyncio.gather(
+            count_in_new_session(),
+            query(self.dbsession).all(stmt.limit(page_size).offset(offset)),
+        )
+        return rows.items, total
 
     async def paginate_from_request(
         self,
@@ -195,6 +320,199 @@ class PageNumberPaginator(Paginator):
         current_page = _safe_int(request.query_params.get(page_param, 1), 1)
         current_page = max(1, current_page)
 
-        limit = _safe_int(request.query_params.get(page_size_param, 0), page_size)
+        limit = _safe_int(request.query_params.get(page_size_param, page_size), page_size)
         limit = min(max_page_size, limit)
         return await self.paginate(stmt, current_page, limit)
+
+
+class KeysetPage(typing.Generic[T]):
+    __slots__ = ("rows", "page_size", "next_cursor", "previous_cursor")
+
+    def __init__(
+        self,
+        items: typing.Sequence[T],
+        page_size: int,
+        next_cursor: str | None = None,
+        previous_cursor: str | None = None,
+    ) -> None:
+        self.rows = items
+        self.page_size = page_size
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    @property
+    def has_next(self) -> bool:
+        """Test if the next page is available."""
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self) -> bool:
+        """Test if the previous page is available."""
+        return self.previous_cursor is not None
+
+    @property
+    def has_other(self) -> bool:
+        """Test if page has next or previous pages."""
+        return self.has_next or self.has_previous
+
+    def __iter__(self) -> typing.Iterator[T]:
+        return iter(self.rows)
+
+    def __getitem__(self, item: int) -> T:
+        return self.rows[item]
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __bool__(self) -> bool:
+        return len(self.rows) > 0
+
+    def __json__(self) -> dict[str, typing.Any]:
+        return {
+            "items": self.rows,
+            "page_size": self.page_size,
+            "next_cursor": self.next_cursor,
+            "previous_cursor": self.previous_cursor,
+            "has_next": self.has_next,
+            "has_previous": self.has_previous,
+        }
+
+    def __repr__(self) -> str:
+        return f"<KeysetPage: rows={len(self.rows)}, has_next={self.has_next}, has_previous={self.has_previous}>"
+
+
+def _encode_cursor_value(value: typing.Any) -> typing.Any:
+    if isinstance(value, datetime.datetime):
+        return {"$datetime": value.isoformat()}
+    if isinstance(value, datetime.date):
+        return {"$date": value.isoformat()}
+    if isinstance(value, decimal.Decimal):
+        return {"$decimal": str(value)}
+    if isinstance(value, uuid.UUID):
+        return {"$uuid": str(value)}
+    return value
+
+
+def _decode_cursor_value(value: typing.Any) -> typing.Any:
+    if isinstance(value, dict) and len(value) == 1:
+        [(tag, raw)] = value.items()
+        decoders: dict[str, typing.Callable[[str], typing.Any]] = {
+            "$datetime": datetime.datetime.fromisoformat,
+            "$date": datetime.date.fromisoformat,
+            "$decimal": decimal.Decimal,
+            "$uuid": uuid.UUID,
+        }
+        if tag in decoders:
+            return decoders[tag](raw)
+    return value
+
+
+def encode_cursor(values: typing.Sequence[typing.Any], backwards: bool = False) -> str:
+    """Encode sort key values of a row into an opaque URL-safe cursor."""
+    payload = {"d": "p" if backwards else "n", "k": [_encode_cursor_value(value) for value in values]}
+    data = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(data).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[list[typing.Any], bool]:
+    """Decode a cursor created by `encode_cursor`.
+
+    Returns a tuple of sort key values and the "backwards" flag.
+
+    :raises CursorError: if the cursor is malformed
+    """
+    try:
+        data = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(data)
+        values = [_decode_cursor_value(value) for value in payload["k"]]
+        return values, payload["d"] == "p"
+    except (ValueError, TypeError, KeyError) as ex:
+        raise CursorError(f"Invalid pagination cursor: {cursor!r}") from ex
+
+
+class KeysetPaginator(Paginator):
+    """Cursor based paginator.
+
+    Instead of skipping rows with OFFSET, it seeks directly to the row after the cursor
+    using `WHERE (a, b) > (:a, :b)`, so the cost of a page does not depend on its position.
+    The ordering columns must form a unique key (add the primary key as the last column).
+    """
+
+    async def paginate(
+        self,
+        stmt: sa.Select[tuple[T]],
+        columns: typing.Sequence[KeysetColumn],
+        page_size: int,
+        cursor: str | None = None,
+        descending: bool = False,
+    ) -> KeysetPage[T]:
+        """Fetch a page of rows that follows (or precedes) the cursor.
+
+        :raises CursorError: if the cursor is malformed
+        """
+        values: list[typing.Any] | None = None
+        backwards = False
+        if cursor:
+            values, backwards = decode_cursor(cursor)
+            if len(values) != len(columns):
+                raise CursorError("Cursor does not match the ordering columns.")
+
+        seek_descending = descending != backwards
+        if values is not None:
+            stmt = stmt.where(self._seek_predicate(columns, values, seek_descending))
+
+        ordering = [column.desc() if seek_descending else column.asc() for column in columns]
+        stmt = stmt.order_by(None).order_by(*ordering).limit(page_size + 1)
+        rows = (await query(self.dbsession).all(stmt)).items
+
+        has_more = len(rows) > page_size
+        del rows[page_size:]
+        if backwards:
+            rows.reverse()
+
+        has_next = has_more if not backwards else True
+        has_previous = has_more if backwards else values is not None
+
+        next_cursor = previous_cursor = None
+        if rows and has_next:
+            next_cursor = encode_cursor(self._row_keys(rows[-1], columns))
+        if rows and has_previous:
+            previous_cursor = encode_cursor(self._row_keys(rows[0], columns), backwards=True)
+
+        return KeysetPage(rows, page_size=page_size, next_cursor=next_cursor, previous_cursor=previous_cursor)
+
+    async def paginate_from_request(
+        self,
+        request: Request,
+        stmt: sa.Select[tuple[T]],
+        columns: typing.Sequence[KeysetColumn],
+        page_size: int = 100,
+        cursor_param: str = "cursor",
+        page_size_param: str = "page_size",
+        max_page_size: int = 100,
+        descending: bool = False,
+    ) -> KeysetPage[T]:
+        """Paginate using the cursor from the query string.
+        Malformed cursors are ignored and the first page is returned."""
+        limit = _safe_int(request.query_params.get(page_size_param, page_size), page_size)
+        limit = min(max_page_size, limit)
+
+        cursor = request.query_params.get(cursor_param)
+        try:
+            return await self.paginate(stmt, columns, limit, cursor=cursor, descending=descending)
+        except CursorError:
+            return await self.paginate(stmt, columns, limit, descending=descending)
+
+    def _seek_predicate(
+        self, columns: typing.Sequence[KeysetColumn], values: typing.Sequence[typing.Any], descending: bool
+    ) -> sa.ColumnElement[bool]:
+        bounds = [sa.bindparam(None, value, type_=column.type) for column, value in zip(columns, values)]
+        if len(columns) == 1:
+            return columns[0] < bounds[0] if descending else columns[0] > bounds[0]
+
+        key = sa.tuple_(*columns)
+        bound = sa.tuple_(*bounds)
+        return key < bound if descending else key > bound
+
+    def _row_keys(self, row: typing.Any, columns: typing.Sequence[KeysetColumn]) -> list[typing.Any]:
+        return [getattr(row, str(column.key)) for column in columns]
@@ -1,16 +1,25 @@
 import operator
+import time
 import typing
 
 import sqlalchemy as sa
 from sqlalchemy.exc import MultipleResultsFound, NoResultFound
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstanceState
 
-from starlette_sqlalchemy.collection import Collection
+from starlette_sqlalchemy.collection import Collection, ColumnarCollection
+from starlette_sqlalchemy.instrumentation import instrument
+
+if typing.TYPE_CHECKING:  # pragma: no cover
+    from starlette_sqlalchemy.cache import QueryCache
 
 T = typing.TypeVar("T")
 _DT = typing.TypeVar("_DT")
 _ChoiceLabelT = typing.TypeVar("_ChoiceLabelT")
 _ChoiceValueT = typing.TypeVar("_ChoiceValueT")
+SessionFactory = typing.Callable[[], typing.AsyncContextManager[AsyncSession]]
+RowMode = typing.Literal["scalars", "tuples", "mappings"]
+Params = typing.Mapping[str, typing.Any]
 
 
 class QueryError(Exception): ...
@@ -22,21 +31,52 @@ class NoResultError(QueryError, NoResultFound): ...
 class MultipleResultsError(QueryError, MultipleResultsFound): ...
 
 
+def get_statement_key(dbsession: AsyncSession, stmt: sa.ClauseElement, params: Params | None = None) -> str:
+    """Return a string that identifies the statement compiled for the session dialect, including bound values.
+
+    :param params: values of `bindparam` placeholders passed at execution time
+    """
+    # values of expanding IN lists are part of the bound values, placeholders without values are not rendered
+    compiled = stmt.compile(dialect=dbsession.get_bind().dialect)
+    values = {**compiled.params, **params} if params else compiled.params
+    return f"{compiled}|{sorted(values.items())!r}"
+
+
+def get_selected_entity(stmt: sa.Select[typing.Any]) -> typing.Any:
+    """Return the mapped class (or alias) if the statement selects exactly one ORM entity, otherwise None."""
+    descriptions = stmt.column_descriptions
+    if len(descriptions) == 1:
+        inspected = sa.inspect(descriptions[0]["expr"], raiseerr=False)
+        if getattr(inspected, "is_mapper", False) or getattr(inspected, "is_aliased_class", False):
+            return descriptions[0]["expr"]
+    return None
+
+
 class Query:
-    def __init__(self, dbsession: AsyncSession) -> None:
+    def __init__(self, dbsession: AsyncSession, cache: "QueryCache | None" = None) -> None:
+        """
+        :param cache: cache results of all read methods except `iterator` and `partitions`.
+
+        `one`, `one_or_none`, `one_or_raise`, `one_or_default`, `all`, `exists` and `count` accept `params`,
+        values of `bindparam` placeholders, to execute prebuilt statements without rebuilding them.
+        """
         self.dbsession = dbsession
+        self.cache = cache
 
-    async def one(self, stmt: sa.Select[tuple[T]]) -> T:
+    async def one(self, stmt: sa.Select[tuple[T]], params: Params | None = None) -> T:
         """Return exactly one row or raise an exception."""
         try:
-            rows = await self.dbsession.scalars(stmt)
-            return rows.one()
+            with instrument(self.dbsession, "one", stmt) as measurement:
+                rows = await self._scalars(stmt, params)
+                entity = rows.one()
+                measurement.rows = 1
+            return entity
         except NoResultFound as ex:
             raise NoResultError from ex
         except MultipleResultsFound as ex:
             raise MultipleResultsError from ex
 
-    async def one_or_none(self, stmt: sa.Select[tuple[T]]) -> T | None:
+    async def one_or_none(self, stmt: sa.Select[tuple[T]], params: Params | None = None) -> T | None:
         """Return exactly one row or None.
         Note, if there are more than one row, it will raise MultipleResultsError exception.
 
@@ -45,43 +85,102 @@ class Query:
         :return: T | None
         """
         try:
-            rows = await self.dbsession.scalars(stmt)
-            return rows.one_or_none()
+            with instrument(self.dbsession, "one_or_none", stmt) as measurement:
+                rows = await self._scalars(stmt, params)
+                entity = rows.one_or_none()
+                measurement.rows = 0 if entity is None else 1
+            return entity
         except MultipleResultsFound as ex:
             raise MultipleResultsError from ex
 
-    async def one_or_raise(self, stmt: sa.Select[tuple[T]], exc: Exception) -> T:
+    async def one_or_raise(self, stmt: sa.Select[tuple[T]], exc: Exception, params: Params | None = None) -> T:
         """Return exactly one row or raise a custom exception if no row exists."""
-        entity = await self.one_or_none(stmt)
+        entity = await self.one_or_none(stmt, params)
         if entity is None:
             raise exc
         return entity
 
-    async def one_or_default(self, stmt: sa.Select[tuple[T]], default_value: _DT) -> T | _DT:
-        entity = await self.one_or_none(stmt)
+    async def one_or_default(
+        self, stmt: sa.Select[tuple[T]], default_value: _DT, params: Params | None = None
+    ) -> T | _DT:
+        entity = await self.one_or_none(stmt, params)
         return entity if entity else default_value
 
-    async def all(self, stmt: sa.Select[tuple[T]]) -> Collection[T]:
+    async def all(self, stmt: sa.Select[tuple[T]], params: Params | None = None) -> Collection[T]:
         """Return all rows as a collection."""
-        result = await self.dbsession.scalars(stmt)
-        return Collection(result.all())
+        with instrument(self.dbsession, "all", stmt) as measurement:
+            result = await self._scalars(stmt, params)
+            rows = result.all()
+            measurement.rows = len(rows)
+        return Collection.wrap(rows)
 
-    async def iterator(self, stmt: sa.Select[tuple[T]], batch_size: int = 1000) -> typing.AsyncGenerator[T, None]:
-        stmt = stmt.execution_options(yield_per=batch_size)
-        result = await self.dbsession.stream(stmt)
-        async for partition in result.partitions(batch_size):
+    async def iterator(
+        self,
+        stmt: sa.Select[typing.Any],
+        batch_size: int = 1000,
+        rows: RowMode = "scalars",
+        expunge: bool = False,
+    ) -> typing.AsyncGenerator[typing.Any, None]:
+        """Stream rows using a server-side cursor, fetching `batch_size` rows at a time.
+
+        :param rows: "scalars" yields the first column (entity), "tuples" yields rows, "mappings" yields dict-like rows
+        :param expunge: remove ORM objects of the partition from the session once it is consumed,
+                        keeps memory constant during long exports
+        """
+        async for partition in self.partitions(stmt, batch_size, rows=rows, expunge=expunge):
             for row in partition:
-                yield row[0]
+                yield row
+
+    async def partitions(
+        self,
+        stmt: sa.Select[typing.Any],
+        batch_size: int = 1000,
+        rows: RowMode = "scalars",
+        expunge: bool = False,
+    ) -> typing.AsyncGenerator[typing.Sequence[typing.Any], None]:
+        """Stream rows in lists of up to `batch_size` rows. See `iterator` for the description of arguments."""
+        stmt = stmt.execution_options(yield_per=batch_size)
+        with instrument(self.dbsession, "iterator", stmt) as measurement:
+            # only the time spent fetching is measured, the time consumers spend on partitions is excluded
+            measurement.rows, measurement.elapsed = 0, 0.0
+            started = time.perf_counter()
+            result = await self.dbsession.stream(stmt)
+            source: typing.Any = result
+            if rows == "scalars":
+                source = result.scalars()
+            elif rows == "mappings":
+                source = result.mappings()
+
+            async for partition in source.partitions(batch_size):
+                measurement.elapsed += time.perf_counter() - started
+                measurement.rows += len(partition)
+                yield partition
+                if expunge:
+                    self._expunge_rows(partition, rows)
+                started = time.perf_counter()
+            measurement.elapsed += time.perf_counter() - started
+
+    def _expunge_rows(self, partition: typing.Sequence[typing.Any], rows: RowMode) -> None:
+        for row in partition:
+            values = [row] if rows == "scalars" else row.values() if rows == "mappings" else row
+            for value in values:
+                state = sa.inspect(value, raiseerr=False)
+                if isinstance(state, InstanceState) and state.session_id is not None:
+                    self.dbsession.expunge(value)
 
-    async def exists(self, stmt: sa.Select[tuple[T]]) -> bool:
+    async def exists(self, stmt: sa.Select[tuple[T]], params: Params | None = None) -> bool:
         stmt = sa.select(sa.exists(stmt))
-        result = await self.dbsession.scalars(stmt)
-        return result.one() is True
+        with instrument(self.dbsession, "exists", stmt) as measurement:
+            result = await self._scalars(stmt, params)
+            measurement.rows = 1
+            return result.one() is True
 
-    async def count(self, stmt: sa.Select[tuple[typing.Any]]) -> int:
+    async def count(self, stmt: sa.Select[tuple[typing.Any]], params: Params | None = None) -> int:
         stmt = sa.select(sa.func.count()).select_from(stmt.subquery())
-        result = await self.dbsession.scalars(stmt)
-        count = result.one()
+        with instrument(self.dbsession, "count", stmt) as measurement:
+            result = await self._scalars(stmt, params)
+            count = result.one()
+            measurement.rows = 1
         return int(count) if count else 0
 
     @typing.overload
@@ -122,8 +221,108 @@ class Query:
         # label_getter = label_attr if callable(label_attr) else operator.attrgetter(label_attr)
         # value_getter = value_attr if callable(value_attr) else operator.attrgetter(value_attr)
 
-        for item in await self.all(stmt):
+        if isinstance(label_attr, str) and isinstance(value_attr, str):
+            columns = self._get_entity_columns(stmt, value_attr, label_attr)
+            if columns is not None:
+                # both attributes are plain columns, fetch only them instead of loading objects
+                stmt = stmt.with_only_columns(*columns, maintain_column_froms=True)
+                with instrument(self.dbsession, "choices", stmt) as measurement:
+                    result = await self._execute(stmt)
+                    rows = result.all()
+                    measurement.rows = len(rows)
+                for value, label in rows:
+                    yield value, label
+                return
+
+        with instrument(self.dbsession, "choices", stmt) as measurement:
+            scalars = await self._scalars(stmt)
+            items = scalars.all()
+            measurement.rows = len(items)
+        for item in items:
             yield value_getter(item), label_getter(item)
 
+    async def values(self, stmt: sa.Select[typing.Any], *columns: typing.Any) -> Collection[sa.Row[typing.Any]]:
+        """Return tuple rows with only the given columns, without loading ORM objects.
+
+        Columns can be column expressions or names of attributes of the selected entity.
+        The statement keeps its FROM, WHERE and ORDER BY clauses. Returns all statement columns when none given.
+
+        Usage:
+            rows = await query.values(sa.select(User).where(User.active), User.id, "name")
+        """
+        if columns:
+            stmt = stmt.with_only_columns(
+                *[self._get_entity_column(stmt, column) if isinstance(column, str) else column for column in columns],
+                maintain_column_froms=True,
+            )
+        with instrument(self.dbsession, "values", stmt) as measurement:
+            result = await self._execute(stmt)
+            rows = result.all()
+            measurement.rows = len(rows)
+        return Collection.wrap(rows)
+
+    async def mappings(self, stmt: sa.Select[typing.Any]) -> Collection[sa.RowMapping]:
+        """Return rows as read-only dicts keyed by column names, without loading ORM objects.
+
+        Statements selecting a single entity are expanded into its columns.
+        """
+        stmt = self._expand_entity(stmt)
+        with instrument(self.dbsession, "mappings", stmt) as measurement:
+            result = await self._execute(stmt)
+            rows = result.mappings().all()
+            measurement.rows = len(rows)
+        return Collection.wrap(rows)
+
+    async def columnar(self, stmt: sa.Select[typing.Any], use_numpy: bool | None = None) -> ColumnarCollection:
+        """Return rows as a column-oriented collection, without loading ORM objects.
+
+        Statements selecting a single entity are expanded into its columns.
+        See `ColumnarCollection.from_rows` for `use_numpy`.
+        """
+        stmt = self._expand_entity(stmt)
+        with instrument(self.dbsession, "columnar", stmt) as measurement:
+            result = await self._execute(stmt)
+            rows = result.all()
+            measurement.rows = len(rows)
+        return ColumnarCollection.from_rows(list(result.keys()), rows, use_numpy=use_numpy)
+
+    def _expand_entity(self, stmt: sa.Select[typing.Any]) -> sa.Select[typing.Any]:
+        entity = get_selected_entity(stmt)
+        if entity is None:
+            return stmt
+
+        return stmt.with_only_columns(
+            *[getattr(entity, attr.key) for attr in sa.inspect(entity).mapper.column_attrs],
+            maintain_column_froms=True,
+        )
+
+    def _get_entity_column(self, stmt: sa.Select[typing.Any], name: str) -> typing.Any:
+        columns = self._get_entity_columns(stmt, name)
+        if columns is None:
+            raise QueryError(f"Statement does not select an entity with column attribute '{name}'.")
+        return columns[0]
+
+    def _get_entity_columns(self, stmt: sa.Select[typing.Any], *names: str) -> list[typing.Any] | None:
+        entity = get_selected_entity(stmt)
+        if entity is None:
+            return None
+
+        column_attrs = sa.inspect(entity).mapper.column_attrs
+        if not all(name in column_attrs for name in names):
+            return None
+        return [getattr(entity, name) for name in names]
+
+    async def _execute(self, stmt: sa.Select[typing.Any], params: Params | None = None) -> sa.Result[typing.Any]:
+        result: sa.Result[typing.Any]
+        if self.cache is None:
+            result = await self.dbsession.execute(stmt, params)
+        else:
+            result = await self.cache.execute(self.dbsession, stmt, params)
+        return result
+
+    async def _scalars(self, stmt: sa.Select[tuple[T]], params: Params | None = None) -> sa.ScalarResult[T]:
+        result = await self._execute(stmt, params)
+        return result.scalars()
+
 
 query = Query
@@ -1,17 +1,34 @@
 from __future__ import annotations
 
 import abc
+import asyncio
+import collections
+import copy
 import typing
 
 import sqlalchemy as sa
+from sqlalchemy.dialects import mysql, postgresql, sqlite
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import InstrumentedAttribute
+from sqlalchemy.sql import visitors
 from sqlalchemy.sql.base import ExecutableOption
+from sqlalchemy.sql.elements import BindParameter
 
-from starlette_sqlalchemy.collection import Collection
-from starlette_sqlalchemy.query import NoResultError, query
+from starlette_sqlalchemy.cache import QueryCache
+from starlette_sqlalchemy.collection import chunked, Collection
+from starlette_sqlalchemy.instrumentation import instrument, instrumented
+from starlette_sqlalchemy.query import NoResultError, Params, query, SessionFactory
 
 T = typing.TypeVar("T")
+_RepoT = typing.TypeVar("_RepoT", bound="Repo[typing.Any]")
+_LOADERS_KEY = "starlette_sqlalchemy.loaders"
+_LOADERS_LOCK_KEY = "starlette_sqlalchemy.loaders_lock"
+_PK_PARAM = "_repo_pk"
+
+# statement templates shared by instances of repos with `cache_statements`, see `Repo._get_template`,
+# least recently used templates are evicted above `_MAX_STATEMENTS`
+_MAX_STATEMENTS = 1000
+_statements: collections.OrderedDict[tuple[typing.Any, ...], sa.Select[typing.Any]] = collections.OrderedDict()
 
 
 class RepoError(Exception):
@@ -23,37 +40,283 @@ class RepoFilter(typing.Generic[T], abc.ABC):
     def apply(self, stmt: sa.Select[tuple[T]]) -> sa.Select[tuple[T]]:  # pragma: no cover
         raise NotImplementedError()
 
+    def cache_key(self) -> typing.Hashable | None:
+        """Return a key of the statement shape built by `apply`, to let `Repo.cache_statements` reuse it.
+
+        Filters with a key must not embed values into the statement:
+        compare with `sa.bindparam(name)` placeholders in WHERE criteria and return the values from `get_params`.
+        Placeholder names must be unique within a composed filter,
+        groups rename placeholders that their filters share, see `AndFilter`.
+        Return None (default) if the statement can't be reused.
+        """
+        return None
+
+    def get_params(self) -> dict[str, typing.Any]:
+        """Return values of `bindparam` placeholders used by `apply`."""
+        return {}
+
     def __and__(self, other: RepoFilter[T]) -> RepoFilter[T]:
-        return CompositeFilter(self, other)
+        return AndFilter(self, other)
+
+    def __or__(self, other: RepoFilter[T]) -> RepoFilter[T]:
+        return OrFilter(self, other)
+
+    def __invert__(self) -> RepoFilter[T]:
+        return NotFilter(self)
+
+
+def split_criteria(
+    filter_: RepoFilter[T], stmt: sa.Select[tuple[T]]
+) -> tuple[sa.Select[tuple[T]], sa.ColumnElement[bool] | None]:
+    """Apply the filter and separate WHERE criteria it added from other changes of the statement.
+
+    Returns the statement with joins and options added by the filter but without its criteria,
+    and the criteria joined with AND, or None if the filter added no criteria.
+    """
+    applied = filter_.apply(stmt)
+    # Select has no public API to list or remove WHERE criteria one by one
+    criteria = applied._where_criteria[len(stmt._where_criteria) :]
+    applied = applied.where()  # a copy, to not modify the statement returned by the filter
+    applied._where_criteria = stmt._where_criteria
+    return applied, sa.and_(*criteria) if criteria else None
+
+
+def _is_same_filter(left: RepoFilter[typing.Any], right: RepoFilter[typing.Any]) -> bool:
+    if left is right:
+        return True
+    if type(left) is not type(right):
+        return False
+    try:
+        return bool(vars(left) == vars(right))
+    except TypeError:  # values without equality, for example, SQL expressions
+        return False
+
+
+def rename_params(clause: sa.ColumnElement[bool], names: typing.Mapping[str, str]) -> sa.ColumnElement[bool]:
+    """Return the clause with `bindparam` placeholders renamed according to `names`."""
+
+    def replace(element: typing.Any, **kwargs: typing.Any) -> typing.Any:
+        if isinstance(element, BindParameter) and element.key in names:
+            return sa.bindparam(names[element.key], type_=element.type, expanding=element.expanding)
+        return None
+
+    return visitors.replacement_traverse(clause, {}, replace)
+
+
+class _FilterGroup(RepoFilter[T]):
+    """Placeholders used by more than one filter of the group are renamed to "<name>__<position>",
+    so every filter binds its own values."""
+
+    def __init__(self, *filters: RepoFilter[T]) -> None:
+        # nested groups of the same kind are flattened, equal filters are kept once
+        self.filters: list[RepoFilter[T]] = []
+        for filter_ in filters:
+            children = filter_.filters if isinstance(filter_, type(self)) else [filter_]
+            for child in children:
+                if not any(_is_same_filter(child, existing) for existing in self.filters):
+                    self.filters.append(child)
+
+    def cache_key(self) -> typing.Hashable | None:
+        keys = [filter_.cache_key() for filter_ in self.filters]
+        if any(key is None for key in keys):
+            return None
+        return (type(self), *keys)
+
+    def get_params(self) -> dict[str, typing.Any]:
+        return {
+            renames.get(key, key): value
+            for filter_, renames in zip(self.filters, self.get_renames())
+            for key, value in filter_.get_params().items()
+        }
+
+    def get_renames(self) -> list[dict[str, str]]:
+        """Return new placeholder names for every filter, for names shared with other filters of the group."""
+        names = [list(filter_.get_params()) for filter_ in self.filters]
+        counts = collections.Counter(name for keys in names for name in keys)
+        return [{name: f"{name}__{index}" for name in keys if counts[name] > 1} for index, keys in enumerate(names)]
+
+
+class AndFilter(_FilterGroup[T]):
+    """Match rows that match all filters, created by `filter & filter`."""
+
+    @property
+    def left(self) -> RepoFilter[T]:
+        """The first filter, kept for compatibility with the two-operand `CompositeFilter`."""
+        return self.filters[0]
+
+    @property
+    def right(self) -> RepoFilter[T]:
+        """The rest of filters, kept for compatibility with the two-operand `CompositeFilter`."""
+        rest = self.filters[1:] or self.filters
+        return rest[0] if len(rest) == 1 else AndFilter(*rest)
 
+    def apply(self, stmt: sa.Select[tuple[T]]) -> sa.Select[tuple[T]]:
+        clauses = []
+        for filter_, renames in zip(self.filters, self.get_renames()):
+            stmt, criteria = split_criteria(filter_, stmt)
+            if criteria is not None:
+                clauses.append(rename_params(criteria, renames) if renames else criteria)
+        return stmt.where(sa.and_(*clauses)) if clauses else stmt
+
+
+class OrFilter(_FilterGroup[T]):
+    """Match rows that match any of filters, created by `filter | filter`.
+    Joins added by filters apply to the whole statement."""
+
+    def apply(self, stmt: sa.Select[tuple[T]]) -> sa.Select[tuple[T]]:
+        clauses = []
+        matches_all = False
+        for filter_, renames in zip(self.filters, self.get_renames()):
+            stmt, criteria = split_criteria(filter_, stmt)
+            if criteria is None:
+                matches_all = True
+            else:
+                clauses.append(rename_params(criteria, renames) if renames else criteria)
+        return stmt if matches_all else stmt.where(sa.or_(*clauses))
+
+
+class NotFilter(RepoFilter[T]):
+    """Match rows that don't match the filter, created by `~filter`."""
 
-class CompositeFilter(RepoFilter[T]):
-    def __init__(self, left: RepoFilter[T], right: RepoFilter[T]) -> None:
-        self.left = left
-        self.right = right
+    def __init__(self, filter_: RepoFilter[T]) -> None:
+        self.filter = filter_
 
     def apply(self, stmt: sa.Select[tuple[T]]) -> sa.Select[tuple[T]]:
-        stmt = self.left.apply(stmt)
-        return self.right.apply(stmt)
+        stmt, criteria = split_criteria(self.filter, stmt)
+        return stmt if criteria is None else stmt.where(sa.not_(criteria))
+
+    def cache_key(self) -> typing.Hashable | None:
+        key = self.filter.cache_key()
+        return None if key is None else (NotFilter, key)
+
+    def get_params(self) -> dict[str, typing.Any]:
+        return self.filter.get_params()
+
+    def __invert__(self) -> RepoFilter[T]:
+        return self.filter
+
+
+# backward compatible name
+CompositeFilter = AndFilter
+
+
+class BatchLoader(typing.Generic[T]):
+    """Collect keys requested during the same event loop iteration and load them with one `IN` query.
+
+    Every caller receives its own row, or None if the row does not exist.
+    Batches run one at a time, keys requested while a batch is being loaded are collected into the next one.
+    Loaders of the same session must share `lock`, the session does not support concurrent operations.
+    """
+
+    def __init__(
+        self,
+        dbsession: AsyncSession,
+        stmt: sa.Select[tuple[T]],
+        column: InstrumentedAttribute[typing.Any],
+        batch_size: int = 500,
+        lock: asyncio.Lock | None = None,
+    ) -> None:
+        self.dbsession = dbsession
+        self.stmt = stmt
+        self.column = column
+        self.batch_size = batch_size
+        self._pending: dict[typing.Any, list[asyncio.Future[T | None]]] = {}
+        self._batch: asyncio.Task[None] | None = None
+        self._lock = lock or asyncio.Lock()
+
+    def load(self, key: typing.Any) -> asyncio.Future[T | None]:
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[T | None] = loop.create_future()
+        self._pending.setdefault(key, []).append(future)
+        if self._batch is None:
+            # the task starts after all currently scheduled callbacks had a chance to request their keys
+            self._batch = loop.create_task(self._dispatch())
+        return future
+
+    async def _dispatch(self) -> None:
+        async with self._lock:
+            pending, self._pending, self._batch = self._pending, {}, None
+            await self._load(pending)
+
+    async def _load(self, pending: dict[typing.Any, list[asyncio.Future[T | None]]]) -> None:
+        rows: list[T] = []
+        try:
+            for keys in chunked(pending, self.batch_size):
+                rows.extend(await query(self.dbsession).all(self.stmt.where(self.column.in_(keys))))
+        except Exception as ex:
+            for futures in pending.values():
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(ex)
+            return
+
+        rows_by_key = {getattr(row, self.column.key): row for row in rows}
+        for key, futures in pending.items():
+            for future in futures:
+                if not future.done():
+                    future.set_result(rows_by_key.get(key))
 
 
 class Repo(typing.Generic[T]):
     model_class: type[T] | None = None
     base_query: sa.Select[tuple[T]] | None = None
 
+    # cache results of reads that go through `self.query`, see `QueryCache`
+    cache: QueryCache | None = None
+
+    # loader options applied to every read, for example, `[selectinload(User.addresses)]`
+    default_options: typing.Sequence[ExecutableOption] = ()
+
+    # named sets of loader options added to `default_options`, see `with_profile`
+    load_profiles: typing.Mapping[str, typing.Sequence[ExecutableOption]] = {}
+
+    # build statements of `get`, `get_map` and filters with a `cache_key` once and bind only values per call,
+    # enable when `get_base_query` doesn't depend on the state of the repo instance
+    cache_statements: bool = False
+
+    # rows per INSERT/UPDATE statement of `bulk_insert`, `bulk_upsert` and `bulk_update`
+    bulk_batch_size: int = 1000
+
+    # max keys in a single "IN (...)" list, keep below database bound parameter limits (999 in older SQLite)
+    in_batch_size: int = 500
+
     def __init__(self, dbsession: AsyncSession) -> None:
         self.dbsession = dbsession
-        self.query = query(dbsession)
+        self.query = query(dbsession, cache=self.cache)
+        self.profile: str | None = None
+        self.load_options: tuple[ExecutableOption, ...] = tuple(self.default_options)
         if self.model_class is None:
             raise RepoError("No model class defined for repo '{name}'".format(name=self.__class__.__name__))
+
+        # lookups by primary key may use the session identity map only when the base query has no criteria
+        self._has_default_base_query = self.base_query is None and type(self).get_base_query is Repo.get_base_query
         if self.base_query is None:
             self.base_query = sa.select(self.model_class)
 
     def get_base_query(self) -> sa.Select[tuple[T]]:
-        """Return the base query for this repo."""
+        """Return the base query for this repo with loader options of the repo applied."""
         assert self.base_query is not None
+        if self.load_options:
+            return self.base_query.options(*self.load_options)
         return self.base_query
 
+    def with_profile(self: _RepoT, name: str) -> _RepoT:
+        """Return a copy of the repo that adds loader options of the named profile to `default_options`.
+
+        Usage:
+            user = await repo.with_profile("detail").one(ByEmailFilter(email))
+
+        :raises RepoError: if the profile is not defined in `load_profiles`
+        """
+        if name not in self.load_profiles:
+            raise RepoError(f"Unknown load profile '{name}' for repo '{self.__class__.__name__}'")
+
+        repo = copy.copy(self)
+        repo.profile = name
+        repo.load_options = (*self.default_options, *self.load_profiles[name])
+        return repo
+
+    @instrumented
     async def get(
         self,
         pk: typing.Any,
@@ -62,25 +325,44 @@ class Repo(typing.Generic[T]):
     ) -> T:
         """Get exactly one row by primary key.
 
+        When the repo uses the default base query without loader options, the lookup is by the mapped primary key
+        and no options given, the object already loaded into the session is returned without a database round trip.
+
         If the row does not exist, raise a `NoResultError` exception.
         If more than one row exists, raise a `MultipleResultsError` exception.
 
         :raises NoResultError: if no row is found
         :raises MultipleResultsError: if more than one row is found
         """
-        stmt = self.get_base_query()
-        column: InstrumentedAttribute[typing.Any]
-        if isinstance(pk_column, str):
-            column = getattr(self.model_class, pk_column)
-        else:
-            column = pk_column
+        column = self._resolve_column(pk_column)
+        # an object from the identity map would skip loader options of the repo
+        if not options and not self.load_options and self._is_identity_lookup(column):
+            # served from the identity map without SQL if the object is already loaded
+            with instrument(self.dbsession, "get") as measurement:
+                entity = await self.dbsession.get(self.model_class, pk)  # type: ignore[arg-type]
+                if entity is not None and entity in self.dbsession.deleted:
+                    # deleted but not flushed yet, a SELECT would autoflush the delete and find nothing
+                    entity = None
+                measurement.rows = 0 if entity is None else 1
+            if entity is None:
+                raise NoResultError(f"No row found for {pk!r}.")
+            return entity
+
+        if self.cache_statements and not options:
+            stmt = self._get_template(
+                ("get", column.class_, column.key),
+                lambda: self.get_base_query().where(column == sa.bindparam(_PK_PARAM)),
+            )
+            return await self.query.one(stmt, {_PK_PARAM: pk})
 
+        stmt = self.get_base_query()
         if options:
             stmt = stmt.options(*options)
 
         stmt = stmt.where(column == pk)
         return await self.query.one(stmt)
 
+    @instrumented
     async def get_or_none(
         self,
         pk: typing.Any,
@@ -98,11 +380,105 @@ class Repo(typing.Generic[T]):
         except NoResultError:
             return None
 
+    @instrumented
+    async def load(self, pk: typing.Any, pk_column: str | InstrumentedAttribute[typing.Any] = "id") -> T:
+        """Get exactly one row by primary key, batching concurrent calls.
+
+        Calls made in the same event loop iteration (for example, via `asyncio.gather`)
+        are combined into a single `WHERE pk IN (...)` query. Loaders are shared per session.
+
+        :raises NoResultError: if no row is found
+        """
+        entity = await self.load_or_none(pk, pk_column)
+        if entity is None:
+            raise NoResultError(f"No row found for {pk!r}.")
+        return entity
+
+    @instrumented
+    async def load_or_none(self, pk: typing.Any, pk_column: str | InstrumentedAttribute[typing.Any] = "id") -> T | None:
+        """Get exactly one row by primary key, or None if row does not exist, batching concurrent calls."""
+        return await self.get_loader(pk_column).load(pk)
+
+    def get_loader(self, pk_column: str | InstrumentedAttribute[typing.Any] = "id") -> BatchLoader[T]:
+        """Return the batch loader for the column, one loader per session, repo class, load profile and column.
+
+        The loader keeps the statement of the repo instance that created it,
+        so the base query must not depend on the state of the repo instance.
+        """
+        column = self._resolve_column(pk_column)
+        loaders: dict[typing.Any, BatchLoader[T]] = self.dbsession.info.setdefault(_LOADERS_KEY, {})
+        key = (self.__class__, self.profile, column.key)
+        if key not in loaders:
+            # loaders of all repos share the session, so they share one lock too
+            lock = self.dbsession.info.get(_LOADERS_LOCK_KEY)
+            if lock is None:
+                lock = self.dbsession.info[_LOADERS_LOCK_KEY] = asyncio.Lock()
+            loaders[key] = BatchLoader(self.dbsession, self.get_base_query(), column, self.in_batch_size, lock)
+        return loaders[key]
+
+    @instrumented
+    async def get_many(
+        self,
+        pks: typing.Iterable[typing.Any],
+        pk_column: str | InstrumentedAttribute[typing.Any] = "id",
+        batch_size: int | None = None,
+        session_factory: SessionFactory | None = None,
+    ) -> Collection[T]:
+        """Get rows by primary keys, in the order of given keys. Missing rows are skipped.
+
+        See `get_map` for the description of arguments.
+        """
+        keys = list(pks)
+        rows = await self.get_map(keys, pk_column, batch_size, session_factory)
+        return Collection.wrap([rows[key] for key in keys if key in rows])
+
+    @instrumented
+    async def get_map(
+        self,
+        pks: typing.Iterable[typing.Any],
+        pk_column: str | InstrumentedAttribute[typing.Any] = "id",
+        batch_size: int | None = None,
+        session_factory: SessionFactory | None = None,
+    ) -> dict[typing.Any, T]:
+        """Get rows by primary keys as a dict of key to row. Missing rows are skipped.
+
+        Keys are split into `IN (...)` lists of at most `batch_size` items (default is `in_batch_size`).
+        When `session_factory` is given, the batches run concurrently, each on its own session.
+        Rows loaded this way are detached from the repo session.
+        """
+        column = self._resolve_column(pk_column)
+        chunks = chunked(dict.fromkeys(pks), batch_size or self.in_batch_size)
+        batches: list[tuple[sa.Select[tuple[T]], Params | None]]
+        if self.cache_statements:
+            stmt = self._get_template(
+                ("get_map", column.class_, column.key),
+                lambda: self.get_base_query().where(column.in_(sa.bindparam(_PK_PARAM, expanding=True))),
+            )
+            batches = [(stmt, {_PK_PARAM: keys}) for keys in chunks]
+        else:
+            stmt = self.get_base_query()
+            batches = [(stmt.where(column.in_(keys)), None) for keys in chunks]
+
+        results: typing.Sequence[Collection[T]]
+        if session_factory is not None and len(batches) > 1:
+
+            async def fetch_in_new_session(batch: sa.Select[tuple[T]], params: Params | None) -> Collection[T]:
+                async with session_factory() as dbsession:
+                    return await query(dbsession).all(batch, params)
+
+            results = await asyncio.gather(*[fetch_in_new_session(*batch) for batch in batches])
+        else:
+            results = [await self.query.all(*batch) for batch in batches]
+
+        return {getattr(row, column.key): row for rows in results for row in rows}
+
     def get_filtered_query(self, filter_: RepoFilter[T]) -> sa.Select[tuple[T]]:
         """Return a query with the given filters applied."""
-        stmt = self.get_base_query()
-        return filter_.apply(stmt)
+        stmt = filter_.apply(self.get_base_query())
+        params = filter_.get_params()
+        return stmt.params(params) if params else stmt
 
+    @instrumented
     async def one(self, filter_: RepoFilter[T]) -> T:
         """Return exactly one row that matches the given filters.
 
@@ -113,9 +489,10 @@ class Repo(typing.Generic[T]):
         :raises MultipleResultsError: if more than one row is found
         """
 
-        stmt = self.get_filtered_query(filter_)
-        return await self.query.one(stmt)
+        stmt, params = self._get_filtered_statement(filter_)
+        return await self.query.one(stmt, params)
 
+    @instrumented
     async def one_or_none(self, filter_: RepoFilter[T]) -> T | None:
         """Return exactly one row that matches the given filters, or None if no row exists.
 
@@ -124,26 +501,175 @@ class Repo(typing.Generic[T]):
         :raises MultipleResultsError: if more than one row is found
         """
 
-        stmt = self.get_filtered_query(filter_)
-        return await self.query.one_or_none(stmt)  # type: ignore[arg-type]
+        stmt, params = self._get_filtered_statement(filter_)
+        return await self.query.one_or_none(stmt, params)  # type: ignore[arg-type]
 
+    @instrumented
     async def one_or_default(self, filter_: RepoFilter[T], default: T) -> T:
         """Return all rows that match the given filters."""
 
-        stmt = self.get_filtered_query(filter_)
-        return await self.query.one_or_default(stmt, default)
+        stmt, params = self._get_filtered_statement(filter_)
+        return await self.query.one_or_default(stmt, default, params)
 
+    @instrumented
     async def one_or_raise(self, filter_: RepoFilter[T], exc: Exception) -> T | typing.NoReturn:
         """Return all rows that match the given filters."""
 
-        stmt = self.get_filtered_query(filter_)
-        return await self.query.one_or_raise(stmt, exc)
+        stmt, params = self._get_filtered_statement(filter_)
+        return await self.query.one_or_raise(stmt, exc, params)
 
+    @instrumented
     async def all(self, filter_: RepoFilter[T] | None = None) -> Collection[T]:
         """Return all rows that match the given filters."""
 
         if filter_ is None:
-            stmt = self.get_base_query()
-        else:
-            stmt = self.get_filtered_query(filter_)
-        return await self.query.all(stmt)
+            return await self.query.all(self.get_base_query())
+
+        stmt, params = self._get_filtered_statement(filter_)
+        return await self.query.all(stmt, params)
+
+    @instrumented
+    async def bulk_insert(
+        self,
+        rows: typing.Iterable[typing.Mapping[str, typing.Any]],
+        batch_size: int | None = None,
+        returning: bool = False,
+    ) -> list[typing.Any]:
+        """Insert rows given as dicts of attribute values, without creating ORM objects.
+
+        Rows are sent in batches of `batch_size` (default is `bulk_batch_size`) using executemany,
+        or multi-row VALUES when the database supports it.
+
+        :param returning: return primary keys of inserted rows (tuples for composite keys), in the order of rows
+        :returns: primary keys if `returning`, otherwise an empty list
+        """
+        stmt = sa.insert(self.model_class)  # type: ignore[arg-type]
+        return await self._bulk_write("bulk_insert", stmt, rows, batch_size, returning)
+
+    @instrumented
+    async def bulk_upsert(
+        self,
+        rows: typing.Iterable[typing.Mapping[str, typing.Any]],
+        conflict_columns: typing.Sequence[str],
+        update_columns: typing.Sequence[str] | None = None,
+        batch_size: int | None = None,
+        returning: bool = False,
+    ) -> list[typing.Any]:
+        """Insert rows, updating existing ones, without creating ORM objects.
+
+        Uses `INSERT ... ON CONFLICT DO UPDATE` on PostgreSQL and SQLite and `ON DUPLICATE KEY UPDATE` on MySQL,
+        which checks every unique key of the table and ignores `conflict_columns`.
+        All rows must have the same keys. Objects already loaded into the session are not refreshed.
+
+        :param conflict_columns: attributes of the unique constraint that identifies existing rows
+        :param update_columns: attributes to update on conflict, by default all given except `conflict_columns`,
+                               existing rows are left intact when empty
+        :raises RepoError: if the database doesn't support upserts
+        :returns: primary keys if `returning`, otherwise an empty list, see `bulk_insert`
+        """
+        items = rows if isinstance(rows, list) else list(rows)
+        if not items:
+            return []
+
+        if update_columns is None:
+            update_columns = [key for key in items[0] if key not in conflict_columns]
+
+        stmt = self._get_upsert_statement(conflict_columns, update_columns)
+        return await self._bulk_write("bulk_upsert", stmt, items, batch_size, returning)
+
+    @instrumented
+    async def bulk_update(
+        self,
+        rows: typing.Iterable[typing.Mapping[str, typing.Any]],
+        batch_size: int | None = None,
+    ) -> None:
+        """Update rows by primary key using executemany, every row must contain primary key attributes.
+
+        Objects already loaded into the session are updated too.
+        """
+        stmt = sa.update(self.model_class)  # type: ignore[arg-type]
+        await self._bulk_write("bulk_update", stmt, rows, batch_size, False)
+
+    async def _bulk_write(
+        self,
+        method: str,
+        stmt: typing.Any,
+        rows: typing.Iterable[typing.Mapping[str, typing.Any]],
+        batch_size: int | None,
+        returning: bool,
+    ) -> list[typing.Any]:
+        mapper: typing.Any = sa.inspect(self.model_class)
+        primary_key = mapper.primary_key
+        if returning:
+            stmt = stmt.returning(*primary_key, sort_by_parameter_order=True)
+
+        keys: list[typing.Any] = []
+        for batch in chunked(rows, batch_size or self.bulk_batch_size):
+            with instrument(self.dbsession, method, stmt) as measurement:
+                result = await self.dbsession.execute(stmt, batch)
+                measurement.rows = len(batch)
+            if returning:
+                keys.extend(result.scalars() if len(primary_key) == 1 else result.tuples())
+        return keys
+
+    def _get_upsert_statement(
+        self, conflict_columns: typing.Sequence[str], update_columns: typing.Sequence[str]
+    ) -> typing.Any:
+        mapper: typing.Any = sa.inspect(self.model_class)
+        dialect = self.dbsession.get_bind(mapper=mapper).dialect.name
+        if dialect in ("postgresql", "sqlite"):
+            stmt: typing.Any = (postgresql if dialect == "postgresql" else sqlite).insert(self.model_class)
+            names = [mapper.columns[key].name for key in update_columns]
+            if not names:
+                return stmt.on_conflict_do_nothing(index_elements=[mapper.columns[key] for key in conflict_columns])
+
+            return stmt.on_conflict_do_update(
+                index_elements=[mapper.columns[key] for key in conflict_columns],
+                set_={name: stmt.excluded[name] for name in names},
+            )
+
+        if dialect in ("mysql", "mariadb"):
+            stmt = mysql.insert(self.model_class)  # type: ignore[arg-type]
+            if not update_columns:
+                # assigning the existing value of a column to itself keeps existing rows intact
+                column = mapper.columns[conflict_columns[0]]
+                return stmt.on_duplicate_key_update({column.name: column})
+
+            names = [mapper.columns[key].name for key in update_columns]
+            return stmt.on_duplicate_key_update({name: stmt.inserted[name] for name in names})
+
+        raise RepoError(f"Upserts are not supported by the '{dialect}' dialect.")
+
+    def _get_filtered_statement(self, filter_: RepoFilter[T]) -> tuple[sa.Select[tuple[T]], Params | None]:
+        key = filter_.cache_key() if self.cache_statements else None
+        if key is None:
+            return self.get_filtered_query(filter_), None
+
+        return self._get_template(("filter", key), lambda: filter_.apply(self.get_base_query())), filter_.get_params()
+
+    def _get_template(
+        self, key: tuple[typing.Any, ...], build: typing.Callable[[], sa.Select[tuple[T]]]
+    ) -> sa.Select[tuple[T]]:
+        # a reused statement also reuses its SQLAlchemy cache key, which is computed once per statement object
+        key = (self.__class__, self.profile, *key)
+        if key in _statements:
+            _statements.move_to_end(key)
+            return _statements[key]
+
+        stmt = _statements[key] = build()
+        while len(_statements) > _MAX_STATEMENTS:
+            _statements.popitem(last=False)
+        return stmt
+
+    def _resolve_column(self, column: str | InstrumentedAttribute[typing.Any]) -> InstrumentedAttribute[typing.Any]:
+        if isinstance(column, str):
+            return typing.cast(InstrumentedAttribute[typing.Any], getattr(self.model_class, column))
+        return column
+
+    def _is_identity_lookup(self, column: InstrumentedAttribute[typing.Any]) -> bool:
+        if not self._has_default_base_query or column.class_ is not self.model_class:
+            return False
+
+        primary_key = sa.inspect(self.model_class, raiseerr=True).primary_key
+        columns = getattr(column.property, "columns", [])
+        return len(primary_key) == 1 and len(columns) == 1 and columns[0] is primary_key[0]
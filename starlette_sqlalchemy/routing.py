@@ -0,0 +1,93 @@
+import random
+import typing
+
+import sqlalchemy as sa
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Session, UOWTransaction
+from starlette.types import Scope
+
+READ_ONLY_KEY = "starlette_sqlalchemy.read_only"
+_REPLICA_MARKER = "__starlette_sqlalchemy_replica__"
+
+_EndpointT = typing.TypeVar("_EndpointT")
+
+
+def use_replica(endpoint: _EndpointT) -> _EndpointT:
+    """Mark endpoint as read-only, its session reads from a replica regardless of HTTP method."""
+    setattr(endpoint, _REPLICA_MARKER, True)
+    return endpoint
+
+
+def use_primary(endpoint: _EndpointT) -> _EndpointT:
+    """Mark endpoint to always use the primary database, even for safe HTTP methods."""
+    setattr(endpoint, _REPLICA_MARKER, False)
+    return endpoint
+
+
+def is_replica_request(scope: Scope, read_methods: typing.Collection[str] = ("GET", "HEAD")) -> bool:
+    """Test if the request can be served from a read replica.
+
+    Endpoint markers (see `use_replica` and `use_primary`) take precedence over the HTTP method.
+    Note, the endpoint is known only after routing, so the decision may change once the router has run.
+    """
+    marker = getattr(scope.get("endpoint"), _REPLICA_MARKER, None)
+    if marker is not None:
+        return bool(marker)
+    return scope.get("type") == "http" and scope.get("method") in read_methods
+
+
+class RoutingSession(Session):
+    """A session that sends reads to replicas and everything else to the primary bind.
+
+    Replicas are used only when `session.info[READ_ONLY_KEY]` is truthy (or a callable returning truthy value),
+    `DbSessionMiddleware` sets it for safe requests. After the first flush, DML statement or locking read
+    (`SELECT ... FOR UPDATE`), the session sticks to the primary, so the request can read its own writes.
+
+    Usage:
+        async_sessionmaker(primary_engine, sync_session_class=RoutingSession, replicas=[replica_engine])
+    """
+
+    def __init__(
+        self, *args: typing.Any, replicas: typing.Sequence[Engine | AsyncEngine] = (), **kwargs: typing.Any
+    ) -> None:
+        super().__init__(*args, **kwargs)
+        self.replicas = [replica.sync_engine if isinstance(replica, AsyncEngine) else replica for replica in replicas]
+        self.pinned_to_primary = False
+        self._replica: Engine | None = None
+        event.listen(self, "after_flush", self._pin_to_primary)
+
+    def get_bind(
+        self,
+        mapper: typing.Any = None,
+        clause: sa.ClauseElement | None = None,
+        **kwargs: typing.Any,
+    ) -> typing.Any:
+        if clause is not None and (
+            getattr(clause, "is_dml", False) or getattr(clause, "_for_update_arg", None) is not None
+        ):
+            # row locks are taken in the primary transaction, following reads must see the locked rows
+            self.pinned_to_primary = True
+
+        if self._should_use_replica(clause):
+            if self._replica is None:
+                self._replica = random.choice(self.replicas)
+            return self._replica
+        return super().get_bind(mapper, clause=clause, **kwargs)
+
+    def _should_use_replica(self, clause: sa.ClauseElement | None) -> bool:
+        if not self.replicas or self.pinned_to_primary or self._flushing:
+            return False
+
+        # without a statement (for example, `session.connection()`) the caller may write through the connection
+        if clause is None or not getattr(clause, "is_select", False):
+            return False
+
+        read_only = self.info.get(READ_ONLY_KEY, False)
+        if callable(read_only):
+            read_only = read_only()
+        return bool(read_only)
+
+    def _pin_to_primary(self, session: Session, flush_context: UOWTransaction) -> None:
+        self.pinned_to_primary = True
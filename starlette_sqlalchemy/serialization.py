@@ -0,0 +1,100 @@
+import datetime
+import decimal
+import importlib
+import json
+import typing
+import uuid
+
+import sqlalchemy as sa
+from sqlalchemy.orm.attributes import instance_dict
+from starlette.responses import JSONResponse
+
+from starlette_sqlalchemy.collection import Collection, ColumnarCollection, SequenceView
+
+try:
+    orjson: typing.Any = importlib.import_module("orjson")
+except ImportError:  # pragma: no cover
+    orjson = None
+
+Extractor = typing.Callable[[typing.Any], dict[str, typing.Any]]
+
+_extractors: dict[type, Extractor | None] = {}
+
+
+def get_extractor(class_: type) -> Extractor | None:
+    """Return a function that reads column attributes of a mapped class instance into a dict.
+
+    Attributes that are not loaded (deferred or expired) are skipped, reading them would emit SQL.
+    The plan is built once per class and cached. Returns None for classes that are not mapped.
+    """
+    try:
+        return _extractors[class_]
+    except KeyError:
+        pass
+
+    extractor: Extractor | None = None
+    mapper: typing.Any = sa.inspect(class_, raiseerr=False)
+    if mapper is not None and getattr(mapper, "is_mapper", False):
+        keys = tuple(attr.key for attr in mapper.column_attrs)
+
+        def extractor(obj: typing.Any) -> dict[str, typing.Any]:
+            values = instance_dict(obj)
+            return {key: values[key] for key in keys if key in values}
+
+    _extractors[class_] = extractor
+    return extractor
+
+
+def to_primitive(value: typing.Any) -> typing.Any:
+    """Convert ORM objects, rows, collections and pages into JSON compatible structures.
+    Nested values are converted lazily by `dumps`. Raises TypeError for unsupported values."""
+    extractor = get_extractor(type(value))
+    if extractor is not None:
+        return extractor(value)
+    if isinstance(value, Collection):
+        return value.items
+    if isinstance(value, (SequenceView, ColumnarCollection)):
+        return list(value)
+    if isinstance(value, sa.Row):
+        return value._asdict()
+    if isinstance(value, typing.Mapping):
+        return dict(value)
+    if hasattr(value, "__json__"):
+        return value.__json__()
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, (decimal.Decimal, uuid.UUID)):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable.")
+
+
+def dumps(value: typing.Any, default: typing.Callable[[typing.Any], typing.Any] | None = None) -> bytes:
+    """Serialize value to JSON bytes, using orjson when installed.
+
+    ORM objects, rows, `Collection`, `Page` and `KeysetPage` are supported in addition to JSON types.
+    :param default: called for values `to_primitive` cannot convert, for example, `str`
+    """
+
+    def convert(obj: typing.Any) -> typing.Any:
+        try:
+            return to_primitive(obj)
+        except TypeError:
+            if default is None:
+                raise
+            return default(obj)
+
+    if orjson is not None:
+        return typing.cast(bytes, orjson.dumps(value, default=convert, option=orjson.OPT_NON_STR_KEYS))
+    return json.dumps(value, default=convert, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+class ModelJSONResponse(JSONResponse):
+    """A JSON response that serializes ORM objects, rows, collections and pages with `dumps`.
+
+    Usage:
+        return ModelJSONResponse(await repo.all())
+        return ModelJSONResponse(await paginator.paginate(stmt, page=1, page_size=20))
+    """
+
+    def render(self, content: typing.Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import abc
+import csv
+import io
+import typing
+from urllib.parse import quote
+
+import sqlalchemy as sa
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.background import BackgroundTask
+from starlette.responses import StreamingResponse
+
+from starlette_sqlalchemy.query import get_selected_entity, query, RowMode
+from starlette_sqlalchemy.serialization import dumps, get_extractor
+
+if typing.TYPE_CHECKING:  # pragma: no cover
+    from starlette_sqlalchemy.repos import Repo, RepoFilter
+
+_ResponseT = typing.TypeVar("_ResponseT", bound="QueryStreamingResponse")
+
+
+def to_record(row: typing.Any) -> typing.Any:
+    """Convert a row yielded by `Query.iterator` into a JSON/CSV friendly value.
+
+    Mappings and tuple rows become dicts, ORM objects become dicts of their column attributes,
+    other values are returned as is.
+    """
+    extractor = get_extractor(type(row))
+    if extractor is not None:
+        return extractor(row)
+    if isinstance(row, typing.Mapping):
+        return dict(row)
+    if isinstance(row, sa.Row):
+        return row._asdict()
+    return row
+
+
+def encode_ndjson(rows: typing.Iterable[typing.Any]) -> bytes:
+    """Encode rows as newline delimited JSON, values without JSON representation are converted to strings."""
+    return b"".join(dumps(row, default=str) + b"\n" for row in rows)
+
+
+class CSVEncoder:
+    """Encode rows as CSV. The header is taken from keys of the first row,
+    rows that are not dicts are written as a single column."""
+
+    def __init__(self, header: bool = True) -> None:
+        self.header = header
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer)
+
+    def encode(self, rows: typing.Iterable[typing.Any]) -> bytes:
+        for row in rows:
+            record = to_record(row)
+            if self.header and isinstance(record, dict):
+                self._writer.writerow(record.keys())
+            self.header = False
+            self._writer.writerow(record.values() if isinstance(record, dict) else [record])
+
+        value = self._buffer.getvalue()
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        return value.encode()
+
+
+async def ndjson_lines(rows: typing.AsyncIterable[typing.Any]) -> typing.AsyncGenerator[bytes, None]:
+    """Encode rows as newline delimited JSON, one line per row.
+
+    Usage:
+        StreamingResponse(ndjson_lines(query(dbsession).iterator(stmt)), media_type="application/x-ndjson")
+    """
+    async for row in rows:
+        yield encode_ndjson([row])
+
+
+async def csv_lines(rows: typing.AsyncIterable[typing.Any], header: bool = True) -> typing.AsyncGenerator[bytes, None]:
+    """Encode rows as CSV, one line per row. See `CSVEncoder`."""
+    encoder = CSVEncoder(header=header)
+    async for row in rows:
+        yield encoder.encode([row])
+
+
+def get_row_mode(stmt: sa.Select[typing.Any]) -> RowMode:
+    """Return "scalars" for statements selecting a single ORM entity, and "mappings" otherwise."""
+    return "scalars" if get_selected_entity(stmt) is not None else "mappings"
+
+
+class QueryStreamingResponse(StreamingResponse, abc.ABC):
+    """Stream statement results from a server-side cursor.
+
+    Rows are fetched and serialized `batch_size` rows at a time, one body chunk per batch.
+    The next batch is fetched only after the server accepted the previous chunk,
+    so memory stays flat regardless of the result size.
+    ORM objects are removed from the session once serialized, unless `expunge` is False.
+
+    The session must stay open until the body is sent,
+    don't use with `DbSessionMiddleware(release_on_response_start=True)`.
+    """
+
+    def __init__(
+        self,
+        dbsession: AsyncSession,
+        stmt: sa.Select[typing.Any],
+        batch_size: int = 1000,
+        rows: RowMode | None = None,
+        expunge: bool = True,
+        filename: str | None = None,
+        status_code: int = 200,
+        headers: typing.Mapping[str, str] | None = None,
+        media_type: str | None = None,
+        background: BackgroundTask | None = None,
+    ) -> None:
+        partitions = query(dbsession).partitions(stmt, batch_size, rows=rows or get_row_mode(stmt), expunge=expunge)
+        super().__init__(self.encode(partitions), status_code, headers, media_type, background)
+        if filename is not None:
+            self.headers["content-disposition"] = f"attachment; filename*=utf-8''{quote(filename)}"
+
+    @classmethod
+    def from_repo(
+        cls: type[_ResponseT],
+        repo: Repo[typing.Any],
+        filter_: RepoFilter[typing.Any] | None = None,
+        **kwargs: typing.Any,
+    ) -> _ResponseT:
+        """Stream rows of the repo matching the filter."""
+        stmt = repo.get_base_query() if filter_ is None else repo.get_filtered_query(filter_)
+        return cls(repo.dbsession, stmt, **kwargs)
+
+    @abc.abstractmethod
+    def encode(
+        self, partitions: typing.AsyncIterable[typing.Sequence[typing.Any]]
+    ) -> typing.AsyncIterator[bytes]:  # pragma: no cover
+        """Serialize partitions of rows into body chunks."""
+        raise NotImplementedError
+
+
+class NDJSONResponse(QueryStreamingResponse):
+    """Stream rows as newline delimited JSON."""
+
+    media_type = "application/x-ndjson"
+
+    async def encode(
+        self, partitions: typing.AsyncIterable[typing.Sequence[typing.Any]]
+    ) -> typing.AsyncGenerator[bytes, None]:
+        async for partition in partitions:
+            yield encode_ndjson(partition)
+
+
+class CSVResponse(QueryStreamingResponse):
+    """Stream rows as CSV with a header row."""
+
+    media_type = "text/csv"
+
+    async def encode(
+        self, partitions: typing.AsyncIterable[typing.Sequence[typing.Any]]
+    ) -> typing.AsyncGenerator[bytes, None]:
+        encoder = CSVEncoder()
+        async for partition in partitions:
+            yield encoder.encode(partition)
@@ -0,0 +1,210 @@
+import typing
+
+import pytest
+import sqlalchemy as sa
+from sqlalchemy.ext.asyncio import async_sessionmaker, AsyncEngine, AsyncSession
+from sqlalchemy.orm import selectinload
+
+from starlette_sqlalchemy.cache import MemoryCacheBackend, QueryCache
+from starlette_sqlalchemy.query import query
+from starlette_sqlalchemy.repos import Repo
+from tests.models import Profile, User
+
+
+@pytest.fixture
+def cache() -> typing.Generator[QueryCache, None, None]:
+    cache = QueryCache()
+    yield cache
+    cache.dispose()
+
+
+class StatementCounter:
+    def __init__(self, engine: AsyncEngine) -> None:
+        self.engine = engine
+        self.statements: list[str] = []
+
+    def __enter__(self) -> "StatementCounter":
+        sa.event.listen(self.engine.sync_engine, "before_cursor_execute", self._on_execute)
+        return self
+
+    def __exit__(self, *args: typing.Any) -> None:
+        sa.event.remove(self.engine.sync_engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args: typing.Any) -> None:
+        self.statements.append(args[2])
+
+
+async def test_caches_all(dbsession: AsyncSession, dbengine: AsyncEngine, cache: QueryCache) -> None:
+    stmt = sa.select(User).order_by(User.id)
+    users = await query(dbsession, cache=cache).all(stmt)
+    assert len(users) == 9
+
+    with StatementCounter(dbengine) as counter:
+        cached = await query(dbsession, cache=cache).all(stmt)
+    assert counter.statements == []
+    assert [user.id for user in cached] == [user.id for user in users]
+    assert cached[0] is users[0]  # merged into the identity map
+
+
+async def test_merges_into_another_session(
+    dbsession: AsyncSession, dbsession_maker: async_sessionmaker[AsyncSession], dbengine: AsyncEngine, cache: QueryCache
+) -> None:
+    stmt = sa.select(User).where(User.id == 1)
+    await query(dbsession, cache=cache).one(stmt)
+
+    async with dbsession_maker() as other_session:
+        with StatementCounter(dbengine) as counter:
+            user = await query(other_session, cache=cache).one(stmt)
+        assert counter.statements == []
+        assert user.name == "user_01"
+        assert user in other_session
+
+
+async def test_keys_by_loader_options(
+    dbsession: AsyncSession, dbsession_maker: async_sessionmaker[AsyncSession], cache: QueryCache
+) -> None:
+    stmt = sa.select(User).where(User.id == 1)
+    dbsession.expunge_all()
+    await query(dbsession, cache=cache).one(stmt)
+
+    async with dbsession_maker() as other_session:
+        user = await query(other_session, cache=cache).one(stmt.options(selectinload(User.profile)))
+        assert user.profile.bio == "bio_01"
+    assert len(typing.cast(MemoryCacheBackend, cache.backend)) == 2
+
+
+async def test_caches_scalars(dbsession: AsyncSession, dbengine: AsyncEngine, cache: QueryCache) -> None:
+    stmt = sa.select(User).where(User.id > 5)
+    assert await query(dbsession, cache=cache).count(stmt) == 4
+    assert await query(dbsession, cache=cache).exists(stmt)
+
+    with StatementCounter(dbengine) as counter:
+        assert await query(dbsession, cache=cache).count(stmt) == 4
+        assert await query(dbsession, cache=cache).exists(stmt)
+        assert await query(dbsession, cache=cache).count(sa.select(User).where(User.id > 7)) == 2
+    assert len(counter.statements) == 1
+
+
+async def test_caches_values(dbsession: AsyncSession, dbengine: AsyncEngine, cache: QueryCache) -> None:
+    stmt = sa.select(User).where(User.id < 3)
+    rows = await query(dbsession, cache=cache).values(stmt, User.id, User.name)
+
+    with StatementCounter(dbengine) as counter:
+        assert await query(dbsession, cache=cache).values(stmt, User.id, User.name) == rows
+        assert [row["id"] for row in await query(dbsession, cache=cache).mappings(stmt)] == [1, 2]
+    assert len(counter.statements) == 1
+
+
+async def test_invalidates_on_flush(dbsession: AsyncSession, cache: QueryCache) -> None:
+    stmt = sa.select(User)
+    assert await query(dbsession, cache=cache).count(stmt) == 9
+    assert await query(dbsession, cache=cache).count(sa.select(Profile)) == 9
+
+    dbsession.add(User(id=10, name="user_10", email="10@user"))
+    await dbsession.flush()
+    assert await query(dbsession, cache=cache).count(stmt) == 10
+    assert len(typing.cast(MemoryCacheBackend, cache.backend)) == 1  # profiles are still cached
+
+
+async def test_invalidates_on_dml(dbsession: AsyncSession, cache: QueryCache) -> None:
+    stmt = sa.select(User.name).where(User.id == 1)
+    assert await query(dbsession, cache=cache).one(stmt) == "user_01"
+
+    await dbsession.execute(sa.update(User).where(User.id == 1).values(name="updated"))
+    assert await query(dbsession, cache=cache).one(stmt) == "updated"
+
+
+async def test_bypasses_cache_with_uncommitted_writes(dbsession: AsyncSession, cache: QueryCache) -> None:
+    dbsession.add(User(id=10, name="user_10", email="10@user"))
+    await dbsession.flush()
+    assert await query(dbsession, cache=cache).count(sa.select(User)) == 10
+    assert len(typing.cast(MemoryCacheBackend, cache.backend)) == 0
+
+    await dbsession.rollback()
+    assert await query(dbsession, cache=cache).count(sa.select(User)) == 0
+    assert len(typing.cast(MemoryCacheBackend, cache.backend)) == 1
+
+
+async def test_bypasses_cache_with_pending_objects(dbsession: AsyncSession, cache: QueryCache) -> None:
+    stmt = sa.select(User).order_by(User.id)
+    assert len(await query(dbsession, cache=cache).all(stmt)) == 9
+
+    dbsession.add(User(id=10, name="user_10", email="10@user"))
+    assert len(await query(dbsession, cache=cache).all(stmt)) == 10
+
+
+async def test_bypasses_cache_with_dirty_objects(dbsession: AsyncSession, cache: QueryCache) -> None:
+    stmt = sa.select(User.name).where(User.id == 1)
+    assert await query(dbsession, cache=cache).one(stmt) == "user_01"
+
+    user = await query(dbsession).one(sa.select(User).where(User.id == 1))
+    user.name = "updated"
+    assert await query(dbsession, cache=cache).one(stmt) == "updated"
+
+
+async def test_repo_cache(dbsession: AsyncSession, dbengine: AsyncEngine, cache: QueryCache) -> None:
+    class CachedUserRepo(Repo[User]):
+        model_class = User
+
+    CachedUserRepo.cache = cache
+    await CachedUserRepo(dbsession).all()
+    with StatementCounter(dbengine) as counter:
+        assert len(await CachedUserRepo(dbsession).all()) == 9
+    assert counter.statements == []
+
+
+
+async def test_repo_cache_with_statement_cache(
+    dbsession: AsyncSession, dbengine: AsyncEngine, cache: QueryCache
+) -> None:
+    class CachedUserRepo(Repo[User]):
+        model_class = User
+        cache_statements = True
+
+    CachedUserRepo.cache = cache
+    repo = CachedUserRepo(dbsession)
+    assert [user.id for user in await repo.get_many([2, 1])] == [2, 1]
+    with StatementCounter(dbengine) as counter:
+        assert [user.id for user in await repo.get_many([2, 1])] == [2, 1]
+        assert [user.id for user in await repo.get_many([3])] == [3]
+        assert (await repo.get("04@user", pk_column="email")).id == 4
+    assert len(counter.statements) == 2
+
+
+class TestMemoryCacheBackend:
+    async def test_get_set(self) -> None:
+        backend = MemoryCacheBackend()
+        await backend.set("key", b"value", ttl=60, tags=["users"])
+        assert await backend.get("key") == b"value"
+        assert await backend.get("missing") is None
+
+    async def test_expires(self) -> None:
+        backend = MemoryCacheBackend()
+        await backend.set("key", b"value", ttl=0, tags=["users"])
+        assert await backend.get("key") is None
+        assert len(backend) == 0
+
+    async def test_evicts_least_recently_used(self) -> None:
+        backend = MemoryCacheBackend(max_entries=2)
+        await backend.set("one", b"1", ttl=60, tags=[])
+        await backend.set("two", b"2", ttl=60, tags=[])
+        await backend.get("one")
+        await backend.set("three", b"3", ttl=60, tags=[])
+        assert await backend.get("one") == b"1"
+        assert await backend.get("two") is None
+        assert await backend.get("three") == b"3"
+
+    async def test_invalidate_tags(self) -> None:
+        backend = MemoryCacheBackend()
+        await backend.set("one", b"1", ttl=60, tags=["users", "profiles"])
+        await backend.set("two", b"2", ttl=60, tags=["profiles"])
+        await backend.set("three", b"3", ttl=60, tags=["products"])
+        await backend.invalidate_tags(["profiles"])
+        assert len(backend) == 1
+        assert await backend.get("three") == b"3"
+
+    async def test_clear(self) -> None:
+        backend = MemoryCacheBackend()
+        await backend.set("one", b"1", ttl=60, tags=["users"])
+        await backend.clear()
+        assert len(backend) == 0
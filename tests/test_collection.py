@@ -1,6 +1,9 @@
+import array
+import typing
+
 import pytest
 
-from starlette_sqlalchemy.collection import Collection
+from starlette_sqlalchemy.collection import Collection, ColumnarCollection, LazyCollection, SequenceView
 
 
 def test_first() -> None:
@@ -103,6 +106,73 @@ def test_group_by_string_key() -> None:
     }
 
 
+def test_group_by_keeps_order_of_appearance() -> None:
+    collection = Collection([{"id": 3}, {"id": 1}, {"id": 3}])
+    assert list(collection.group_by("id")) == [3, 1]
+
+
+def test_group_by_unorderable_keys() -> None:
+    collection = Collection([{"id": 1}, {"id": "a"}, {"id": None}])
+    assert collection.group_by("id") == {1: [{"id": 1}], "a": [{"id": "a"}], None: [{"id": None}]}
+
+
+def test_find_stops_at_first_match() -> None:
+    calls = []
+
+    def _callback(x: int) -> bool:
+        calls.append(x)
+        return x > 1
+
+    assert Collection([1, 2, 3]).find(_callback) == 2
+    assert calls == [1, 2]
+
+
+def test_find_without_match() -> None:
+    assert Collection([1, 2, 3]).find(lambda x: x > 5) is None
+
+
+class TestIndexBy:
+    def test_index_by(self) -> None:
+        collection = Collection([{"id": 1}, {"id": 2}])
+        assert collection.index_by("id") == {1: {"id": 1}, 2: {"id": 2}}
+        assert collection.index_by(lambda x: x["id"] * 10) == {10: {"id": 1}, 20: {"id": 2}}
+
+    def test_caches_index_by_attribute(self) -> None:
+        collection = Collection([{"id": 1}, {"id": 2}])
+        assert collection.key_value("id") == {1: {"id": 1}, 2: {"id": 2}}
+        assert collection._indexes == {}
+
+        index: dict[int, dict[str, int]] = collection.index_by("id")
+        assert collection.index_by("id") is index
+        assert collection.key_value("id") == index
+        assert collection.key_value("id") is not index
+
+    def test_does_not_cache_callables(self) -> None:
+        collection = Collection([{"id": 1}, {"id": 2}, {"id": 2}])
+        for value in range(3):
+            collection.find_by(lambda x: x["id"], value)
+            collection.index_by(lambda x: x["id"])
+            collection.key_value(lambda x: x["id"])
+        assert collection._indexes == {}
+        assert collection.find_by(lambda x: x["id"], 2) is collection.items[2]
+        assert collection.find_by(lambda x: x["id"], 3) is None
+
+    def test_find_by(self) -> None:
+        collection = Collection([{"id": 1}, {"id": 2}])
+        assert collection.find_by("id", 2) == {"id": 2}
+        assert collection.find_by("id", 3) is None
+
+    def test_invalidates_on_modification(self) -> None:
+        collection = Collection([{"id": 1}, {"id": 2}])
+        assert collection.find_by("id", 3) is None
+
+        collection[0] = {"id": 3}
+        assert collection.find_by("id", 3) == {"id": 3}
+
+        del collection[0]
+        assert collection.find_by("id", 3) is None
+
+
 def test_key_value() -> None:
     collection = Collection(
         [
@@ -149,7 +219,51 @@ def test_get_by_index() -> None:
 
 def test_get_slice() -> None:
     collection = Collection([1, 2, 3])
-    assert collection[1:] == [2, 3]
+    items = collection[1:]
+    assert items == [2, 3]
+    assert isinstance(items, list)
+
+    items.append(4)
+    assert collection.items == [1, 2, 3]
+
+
+class TestSequenceView:
+    def test_slice_is_view(self) -> None:
+        collection = Collection([1, 2, 3, 4, 5])
+        view = collection.view()[1:4]
+        assert isinstance(view, SequenceView)
+        assert view == [2, 3, 4]
+        assert view[0] == 2
+        assert view[-1] == 4
+        assert len(view) == 3
+
+        collection.items[1] = 20
+        assert view[0] == 20
+
+    def test_slice_of_view(self) -> None:
+        view = Collection([1, 2, 3, 4, 5]).view()[1:]
+        assert view[1:3] == [3, 4]
+        assert view[::2] == [2, 4]
+        assert view[::-1] == [5, 4, 3, 2]
+        assert list(view[::-2]) == [5, 3]
+
+    def test_compares(self) -> None:
+        view = Collection([1, 2, 3]).view()[:2]
+        assert view == (1, 2)
+        assert view == Collection([1, 2])
+        assert view != [1, 2, 3]
+        assert view != "12"
+
+
+def test_has_no_instance_dict() -> None:
+    assert not hasattr(Collection([1]), "__dict__")
+    assert not hasattr(Collection([1]).view(), "__dict__")
+
+
+def test_wrap_does_not_copy() -> None:
+    items = [1, 2]
+    assert Collection.wrap(items).items is items
+    assert Collection.wrap((1, 2)).items == [1, 2]
 
 
 def test_delete_by_index() -> None:
@@ -222,3 +336,160 @@ def test_compares() -> None:
 def test_jsonable() -> None:
     collection = Collection([1, 2, 3])
     assert collection.__json__() == [1, 2, 3]
+
+
+class TestColumnarCollection:
+    @pytest.fixture(params=[False, True], ids=["array", "numpy"])
+    def use_numpy(self, request: pytest.FixtureRequest) -> bool:
+        if request.param:
+            pytest.importorskip("numpy")
+        return bool(request.param)
+
+    @pytest.fixture
+    def collection(self, use_numpy: bool) -> ColumnarCollection:
+        rows = [(1, "a", 10.0), (2, "b", 20.0), (3, "a", 30.0), (4, "c", 40.0)]
+        return ColumnarCollection.from_rows(["id", "kind", "total"], rows, use_numpy=use_numpy)
+
+    def test_stores_columns(self) -> None:
+        collection = ColumnarCollection.from_rows(
+            ["id", "name", "total"], [(1, "a", 1.5), (2, "b", 2)], use_numpy=False
+        )
+        assert isinstance(collection.column("id"), array.array)
+        assert isinstance(collection.column("total"), array.array)
+        assert collection.column("name") == ["a", "b"]
+        assert collection.keys() == ["id", "name", "total"]
+
+    def test_stores_mixed_columns_as_lists(self) -> None:
+        collection = ColumnarCollection.from_rows(["id"], [(1,), (None,)], use_numpy=False)
+        assert collection.column("id") == [1, None]
+
+    def test_empty(self, use_numpy: bool) -> None:
+        collection = ColumnarCollection.from_rows(["id"], [], use_numpy=use_numpy)
+        assert len(collection) == 0
+        assert collection.sum("id") == 0
+        assert collection.min("id") is None
+        assert collection.max("id") is None
+        assert collection.mean("id") is None
+
+    def test_aggregates_skip_nulls(self, use_numpy: bool) -> None:
+        rows = [(1, None), (None, None), (3, None), (6, None)]
+        collection = ColumnarCollection.from_rows(["total", "missing"], rows, use_numpy=use_numpy)
+        assert collection.sum("total") == 10
+        assert collection.min("total") == 1
+        assert collection.max("total") == 6
+        assert collection.mean("total") == 10 / 3
+        assert collection.sum("missing") == 0
+        assert collection.min("missing") is None
+        assert collection.max("missing") is None
+        assert collection.mean("missing") is None
+
+    def test_pluck(self, collection: ColumnarCollection) -> None:
+        assert list(collection.pluck("kind")) == ["a", "b", "a", "c"]
+
+    def test_filter(self, collection: ColumnarCollection) -> None:
+        filtered = collection.filter([True, False, False, True])
+        assert list(filtered.column("id")) == [1, 4]
+        assert list(filtered.column("kind")) == ["a", "c"]
+
+    def test_where(self, collection: ColumnarCollection) -> None:
+        assert list(collection.where("total", lambda value: value > 15).column("id")) == [2, 3, 4]
+
+    def test_group_by(self, collection: ColumnarCollection) -> None:
+        groups = collection.group_by("kind")
+        assert list(groups) == ["a", "b", "c"]
+        assert list(groups["a"].column("id")) == [1, 3]
+        assert groups["a"].sum("total") == 40.0
+
+    def test_aggregates(self, collection: ColumnarCollection) -> None:
+        assert collection.sum("id") == 10
+        assert collection.min("total") == 10.0
+        assert collection.max("total") == 40.0
+        assert collection.mean("total") == 25.0
+
+    def test_key_value(self, collection: ColumnarCollection) -> None:
+        assert collection.key_value("id", "kind") == {1: "a", 2: "b", 3: "a", 4: "c"}
+
+    def test_choices(self, collection: ColumnarCollection) -> None:
+        assert collection.choices("kind", "id") == [(1, "a"), (2, "b"), (3, "a"), (4, "c")]
+
+    def test_iterates_rows(self, collection: ColumnarCollection) -> None:
+        assert next(iter(collection)) == {"id": 1, "kind": "a", "total": 10.0}
+        assert len(collection.to_collection()) == 4
+
+    def test_numpy_mask(self) -> None:
+        pytest.importorskip("numpy")
+        collection = ColumnarCollection.from_rows(["id"], [(1,), (2,), (3,)], use_numpy=True)
+        assert list(collection.filter(collection.column("id") > 1).column("id")) == [2, 3]
+
+
+def test_reversed_returns_collection() -> None:
+    collection = Collection([1, 2, 3])
+    assert reversed(collection) == Collection([3, 2, 1])
+    assert collection.reverse() == [3, 2, 1]
+    assert collection == [1, 2, 3]
+
+
+class TestLazyCollection:
+    def test_defers_evaluation(self) -> None:
+        calls = []
+
+        def is_odd(x: int) -> bool:
+            calls.append(x)
+            return x % 2 == 1
+
+        pipeline = Collection([1, 2, 3, 4, 5]).lazy().filter(is_odd).map(lambda x: x * 10)
+        assert calls == []
+        assert pipeline.first() == 10
+        assert calls == [1]
+        assert pipeline.collect() == [10, 30, 50]
+
+    def test_pluck_take_chunk(self) -> None:
+        collection = Collection([{"id": 1}, {"id": 2}, {"id": 3}, {"id": 4}, {"id": 5}])
+        assert list(collection.lazy().pluck("id").take(3).chunk(2)) == [[1, 2], [3]]
+
+    def test_take_zero(self) -> None:
+        assert list(LazyCollection([1, 2]).take(0)) == []
+
+    def test_is_reusable(self) -> None:
+        pipeline = Collection([1, 2, 3]).lazy().map(str)
+        assert list(pipeline) == ["1", "2", "3"]
+        assert list(pipeline) == ["1", "2", "3"]
+
+    def test_first_on_empty(self) -> None:
+        assert LazyCollection([]).first() is None
+
+    async def test_async_source(self) -> None:
+        async def source() -> typing.AsyncGenerator[int, None]:
+            for x in range(1, 6):
+                yield x
+
+        pipeline = LazyCollection(source()).filter(lambda x: x > 1).map(lambda x: x * 2).take(3).chunk(2)
+        assert pipeline.is_async
+        assert await pipeline.acollect() == [[4, 6], [8]]
+
+    async def test_async_source_requires_async_iteration(self) -> None:
+        async def source() -> typing.AsyncGenerator[int, None]:
+            yield 1
+
+        with pytest.raises(TypeError):
+            list(LazyCollection(source()))
+
+    async def test_async_consumption_of_sync_source(self) -> None:
+        pipeline = LazyCollection([{"id": 1}, {"id": 2}]).pluck("id")
+        assert await pipeline.acollect() == [1, 2]
+        assert await pipeline.afirst() == 1
+        assert await LazyCollection[int]([]).afirst() is None
+
+    async def test_afirst_closes_source(self) -> None:
+        closed = False
+
+        async def source() -> typing.AsyncGenerator[int, None]:
+            nonlocal closed
+            try:
+                for x in range(1, 6):
+                    yield x
+            finally:
+                closed = True
+
+        assert await LazyCollection(source()).map(lambda x: x * 2).afirst() == 2
+        assert closed
@@ -2,7 +2,7 @@ import pytest
 import sqlalchemy as sa
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from starlette_sqlalchemy.repos import Repo, RepoFilter
+from starlette_sqlalchemy.repos import AndFilter, CompositeFilter, NotFilter, OrFilter, Repo, RepoFilter
 from tests.models import Product
 
 
@@ -44,3 +44,88 @@ class TestCompositeFilter:
         filters = ByName("product_02") & ById(2)
         product = await product_repo.one(filters)
         assert product.id == 2
+
+
+class ByNameParam(RepoFilter[Product]):
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    def apply(self, stmt: sa.Select[tuple[Product]]) -> sa.Select[tuple[Product]]:
+        return stmt.where(Product.name == sa.bindparam("name"))
+
+    def cache_key(self) -> str:
+        return "name"
+
+    def get_params(self) -> dict[str, str]:
+        return {"name": self.name}
+
+
+@pytest.fixture
+async def products(product_repo: ProductRepo) -> None:
+    product_repo.dbsession.add_all(
+        [
+            Product(id=1, name="product_01"),
+            Product(id=2, name="product_02"),
+            Product(id=3, name="product_02"),
+        ]
+    )
+    await product_repo.dbsession.flush()
+
+
+def get_where(filter_: RepoFilter[Product]) -> str:
+    return str(filter_.apply(sa.select(Product)).whereclause)
+
+
+class TestFilterAlgebra:
+    def test_flattens_and_deduplicates(self) -> None:
+        filter_ = ById(1) & ByName("a") & (ById(1) & ByName("b"))
+        assert isinstance(filter_, AndFilter)
+        assert [type(child) for child in filter_.filters] == [ById, ByName, ByName]
+        assert CompositeFilter is AndFilter
+
+        filter_ = ById(1) | ById(2) | ById(1)
+        assert isinstance(filter_, OrFilter)
+        assert len(filter_.filters) == 2
+
+    def test_and_single_clause(self) -> None:
+        stmt = sa.select(Product).where(Product.id > 0)
+        filtered = (ById(1) & ByName("a") & ById(2)).apply(stmt)
+        assert str(filtered.whereclause) == (
+            "products.id > :id_1 AND products.id = :id_2 AND products.name = :name_1 AND products.id = :id_3"
+        )
+
+    def test_left_and_right(self) -> None:
+        first, second, third = ById(1), ByName("a"), ById(2)
+        composite = CompositeFilter(first, second)
+        assert composite.left is first
+        assert composite.right is second
+
+        filter_ = first & second & third
+        assert isinstance(filter_, AndFilter)
+        assert filter_.left is first
+        assert isinstance(filter_.right, AndFilter)
+        assert filter_.right.filters == [second, third]
+
+    def test_or_single_clause(self) -> None:
+        filter_ = ById(1) | (ByName("a") & ById(2))
+        assert get_where(filter_) == "products.id = :id_1 OR products.name = :name_1 AND products.id = :id_2"
+
+    def test_not(self) -> None:
+        assert get_where(~ById(1)) == "products.id != :id_1"
+        assert get_where(~(ById(1) & ByName("a"))) == "NOT (products.id = :id_1 AND products.name = :name_1)"
+        filter_ = ById(1)
+        assert ~~filter_ is filter_
+
+    def test_cache_key(self) -> None:
+        assert (ByNameParam("a") | ~ByNameParam("b")).cache_key() == (OrFilter, "name", (NotFilter, "name"))
+        assert (ByNameParam("a") | ById(1)).cache_key() is None
+        assert (ByNameParam("a") & ~ById(1)).get_params() == {"name": "a"}
+        assert (ByNameParam("a") | ByNameParam("b")).get_params() == {"name__0": "a", "name__1": "b"}
+
+    async def test_or(self, product_repo: ProductRepo, products: None) -> None:
+        rows = await product_repo.all(ById(1) | ById(3))
+        assert [product.id for product in rows] == [1, 3]
+
+    async def test_not_or(self, product_repo: ProductRepo, products: None) -> None:
+        rows = await product_repo.all(~(ById(1) | ById(3)) & ByName("product_02"))
+        assert [product.id for product in rows] == [2]
@@ -0,0 +1,75 @@
+import sqlalchemy as sa
+from sqlalchemy.dialects import registry
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from starlette_sqlalchemy.counting import _Explain, CachedCount, CappedCount, CountResult, EstimatedCount, ExactCount
+from starlette_sqlalchemy.pagination import PageNumberPaginator
+from tests.models import User
+
+
+async def test_exact_count(dbsession: AsyncSession) -> None:
+    assert await ExactCount().count(dbsession, sa.select(User)) == CountResult(9, exact=True)
+
+
+class TestCachedCount:
+    async def test_caches_result(self, dbsession: AsyncSession) -> None:
+        strategy = CachedCount(ttl=60)
+        assert await strategy.count(dbsession, sa.select(User)) == CountResult(9)
+
+        dbsession.add(User(id=10, name="user_10", email="10@user"))
+        await dbsession.flush()
+        assert await strategy.count(dbsession, sa.select(User)) == CountResult(9)
+
+        strategy.clear()
+        assert await strategy.count(dbsession, sa.select(User)) == CountResult(10)
+
+    async def test_key_includes_bound_values(self, dbsession: AsyncSession) -> None:
+        strategy = CachedCount(ttl=60)
+        assert (await strategy.count(dbsession, sa.select(User).where(User.id > 5))).total == 4
+        assert (await strategy.count(dbsession, sa.select(User).where(User.id > 7))).total == 2
+
+    async def test_expires(self, dbsession: AsyncSession) -> None:
+        strategy = CachedCount(ttl=0)
+        assert await strategy.count(dbsession, sa.select(User)) == CountResult(9)
+
+        dbsession.add(User(id=10, name="user_10", email="10@user"))
+        await dbsession.flush()
+        assert await strategy.count(dbsession, sa.select(User)) == CountResult(10)
+
+    async def test_evicts_oldest(self, dbsession: AsyncSession) -> None:
+        strategy = CachedCount(ttl=60, max_entries=1)
+        await strategy.count(dbsession, sa.select(User).where(User.id > 5))
+        await strategy.count(dbsession, sa.select(User).where(User.id > 7))
+        assert len(strategy._entries) == 1
+
+
+class TestCappedCount:
+    async def test_below_limit(self, dbsession: AsyncSession) -> None:
+        assert await CappedCount(limit=20).count(dbsession, sa.select(User)) == CountResult(9, exact=True)
+
+    async def test_above_limit(self, dbsession: AsyncSession) -> None:
+        assert await CappedCount(limit=5).count(dbsession, sa.select(User)) == CountResult(5, exact=False)
+
+    async def test_respects_statement_limit(self, dbsession: AsyncSession) -> None:
+        stmt = sa.select(User).order_by(User.id).limit(3)
+        assert await CappedCount(limit=5).count(dbsession, stmt) == CountResult(3, exact=True)
+        assert await CappedCount(limit=2).count(dbsession, stmt) == CountResult(2, exact=False)
+
+
+class TestEstimatedCount:
+    async def test_falls_back_on_unsupported_dialect(self, dbsession: AsyncSession) -> None:
+        assert await EstimatedCount().count(dbsession, sa.select(User)) == CountResult(9, exact=True)
+
+    def test_compiles_explain_for_postgresql(self) -> None:
+        sql = str(_Explain(sa.select(User.id)).compile(dialect=registry.load("postgresql")()))
+        assert sql.startswith("EXPLAIN (FORMAT JSON) SELECT users.id")
+
+
+async def test_paginator_uses_count_strategy(dbsession: AsyncSession) -> None:
+    paginator = PageNumberPaginator(dbsession, count_strategy=CappedCount(limit=4))
+    page = await paginator.paginate(sa.select(User).order_by(User.id), page=2, page_size=2)
+    assert page.total == 4
+    assert not page.total_is_exact
+    assert page.has_next
+    assert page.next_page == 3
+    assert str(page) == "Page 2 of 2, rows 3 - 4 of 4+."
@@ -0,0 +1,102 @@
+import contextlib
+import logging
+import typing
+
+import pytest
+import sqlalchemy as sa
+from sqlalchemy.ext.asyncio import async_sessionmaker, AsyncSession
+from sqlalchemy.orm import selectinload, Session
+from starlette.types import Message, Receive, Scope, Send
+
+from starlette_sqlalchemy.detection import NPlusOneDetector, NPlusOneError, NPlusOneWarning
+from starlette_sqlalchemy.middleware import DbSessionMiddleware
+from starlette_sqlalchemy.query import query
+from tests.models import User
+
+
+async def load_profiles(dbsession: AsyncSession, stmt: sa.Select[tuple[User]]) -> list[str]:
+    dbsession.expunge_all()
+    users = await query(dbsession).all(stmt)
+
+    def read_profiles(session: Session) -> list[str]:
+        return [user.profile.bio for user in users]
+
+    return await dbsession.run_sync(read_profiles)
+
+
+@pytest.fixture
+def detector(dbsession: AsyncSession) -> typing.Generator[NPlusOneDetector, None, None]:
+    detector = NPlusOneDetector(mode="raise")
+    detector.attach(dbsession)
+    yield detector
+    detector.detach(dbsession)
+
+
+async def test_raises(dbsession: AsyncSession, detector: NPlusOneDetector) -> None:
+    with pytest.raises(NPlusOneError) as ex:
+        await load_profiles(dbsession, sa.select(User))
+
+    message = str(ex.value)
+    assert "User.profile was lazy loaded 2 times" in message
+    assert "joinedload(User.profile)" in message
+    assert __file__ in message
+
+
+async def test_ignores_single_lazy_load(dbsession: AsyncSession, detector: NPlusOneDetector) -> None:
+    assert await load_profiles(dbsession, sa.select(User).where(User.id == 1)) == ["bio_01"]
+
+
+async def test_ignores_eager_loads(dbsession: AsyncSession, detector: NPlusOneDetector) -> None:
+    bios = await load_profiles(dbsession, sa.select(User).options(selectinload(User.profile)))
+    assert len(bios) == 9
+
+
+async def test_warns(dbsession: AsyncSession) -> None:
+    detector = NPlusOneDetector(mode="warn", threshold=3)
+    detector.attach(dbsession)
+    try:
+        with pytest.warns(NPlusOneWarning, match="lazy loaded 3 times"):
+            await load_profiles(dbsession, sa.select(User))
+    finally:
+        detector.detach(dbsession)
+
+
+async def test_logs_once(dbsession: AsyncSession, caplog: pytest.LogCaptureFixture) -> None:
+    detector = NPlusOneDetector(mode="log")
+    detector.attach(dbsession)
+    try:
+        with caplog.at_level(logging.WARNING, logger="starlette_sqlalchemy.n_plus_one"):
+            await load_profiles(dbsession, sa.select(User))
+    finally:
+        detector.detach(dbsession)
+    assert len(caplog.records) == 1
+    assert "Potential N+1 query" in caplog.text
+
+
+async def test_detach_stops_detection(dbsession: AsyncSession, detector: NPlusOneDetector) -> None:
+    detector.detach(dbsession)
+    assert len(await load_profiles(dbsession, sa.select(User))) == 9
+
+
+async def test_middleware(dbsession_maker: async_sessionmaker[AsyncSession], dbsession: AsyncSession) -> None:
+    async def app(scope: Scope, receive: Receive, send: Send) -> None:
+        # the request session must see the rows flushed by the test session, reuse it
+        request_session = scope["state"]["dbsession"]
+        assert request_session is dbsession
+        await load_profiles(request_session, sa.select(User))
+
+    @contextlib.asynccontextmanager
+    async def session_factory() -> typing.AsyncGenerator[AsyncSession, None]:
+        yield dbsession
+
+    async def receive() -> Message:  # pragma: no cover
+        return {"type": "http.request", "body": b""}
+
+    async def send(message: Message) -> None: ...
+
+    middleware = DbSessionMiddleware(app, session_factory, detector=NPlusOneDetector(mode="raise"))
+    with pytest.raises(NPlusOneError):
+        await middleware({"type": "http", "method": "GET"}, receive, send)
+
+    # the detector is detached when the request ends
+    assert len(await load_profiles(dbsession, sa.select(User))) == 9
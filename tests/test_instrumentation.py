@@ -0,0 +1,182 @@
+import logging
+import os
+import sysconfig
+import typing
+
+import pytest
+import sqlalchemy as sa
+from sqlalchemy.ext.asyncio import async_sessionmaker, AsyncSession
+from starlette.types import Message, Receive, Scope, Send
+
+from starlette_sqlalchemy import instrumentation
+from starlette_sqlalchemy.instrumentation import BaseSink, get_call_site, LoggingSink, QueryEvent, QueryRecorder
+from starlette_sqlalchemy.middleware import DbSessionMiddleware
+from starlette_sqlalchemy.query import query
+from starlette_sqlalchemy.repos import Repo
+from tests.models import User
+
+
+class UserRepo(Repo[User]):
+    model_class = User
+
+
+class ListSink(BaseSink):
+    def __init__(self) -> None:
+        self.events: list[QueryEvent] = []
+
+    def record(self, event: QueryEvent) -> None:
+        self.events.append(event)
+
+
+@pytest.fixture
+def recorder(dbsession: AsyncSession) -> typing.Generator[QueryRecorder, None, None]:
+    recorder = QueryRecorder()
+    recorder.attach(dbsession)
+    yield recorder
+    dbsession.info.clear()
+
+
+async def test_records_query_methods(dbsession: AsyncSession, recorder: QueryRecorder) -> None:
+    await query(dbsession).one(sa.select(User).where(User.id == 1))
+    await query(dbsession).one_or_none(sa.select(User).where(User.id == -1))
+    await query(dbsession).all(sa.select(User))
+    await query(dbsession).count(sa.select(User))
+    await query(dbsession).exists(sa.select(User))
+    await query(dbsession).values(sa.select(User), User.id)
+    await query(dbsession).mappings(sa.select(User.id))
+    await query(dbsession).columnar(sa.select(User.id))
+
+    assert [(event.method, event.rows) for event in recorder.events] == [
+        ("one", 1),
+        ("one_or_none", 0),
+        ("all", 9),
+        ("count", 1),
+        ("exists", 1),
+        ("values", 9),
+        ("mappings", 9),
+        ("columnar", 9),
+    ]
+    assert recorder.count == 8
+    assert recorder.rows == 39
+    assert recorder.elapsed > 0
+
+    event = recorder.events[0]
+    assert event.source is None
+    assert event.statement is not None and "FROM users" in event.statement
+    assert event.call_site is not None and event.call_site.startswith(__file__)
+    assert "test_records_query_methods" in event.call_site
+
+
+
+@pytest.mark.parametrize(
+    "filename",
+    [
+        os.path.join(sysconfig.get_paths()["purelib"], "app", "views.py"),
+        os.path.dirname(instrumentation.__file__) + "_extra" + os.sep + "views.py",
+    ],
+    ids=["site-packages", "package-prefix"],
+)
+def test_call_site_in_installed_packages(filename: str) -> None:
+    namespace: dict[str, typing.Any] = {}
+    exec(compile("def view(fn):\n    return fn()\n", filename, "exec"), namespace)
+    assert namespace["view"](get_call_site) == f"{filename}:2 in view"
+
+
+async def test_fingerprint_ignores_parameters(dbsession: AsyncSession, recorder: QueryRecorder) -> None:
+    await query(dbsession).one(sa.select(User).where(User.id == 1))
+    await query(dbsession).one(sa.select(User).where(User.id == 2))
+    await query(dbsession).one(sa.select(User).where(User.name == "user_01"))
+    fingerprints = [event.fingerprint for event in recorder.events]
+    assert fingerprints[0] == fingerprints[1]
+    assert fingerprints[0] != fingerprints[2]
+
+
+async def test_records_iterator(dbsession: AsyncSession, recorder: QueryRecorder) -> None:
+    ids = [user.id async for user in query(dbsession).iterator(sa.select(User), batch_size=4)]
+    assert len(ids) == 9
+    assert [(event.method, event.rows) for event in recorder.events] == [("iterator", 9)]
+
+
+async def test_records_choices(dbsession: AsyncSession, recorder: QueryRecorder) -> None:
+    choices = [choice async for choice in query(dbsession).choices(sa.select(User), "name", "id")]
+    assert len(choices) == 9
+    choices = [choice async for choice in query(dbsession).choices(sa.select(User).where(User.id < 3))]
+    assert len(choices) == 2
+    assert [(event.method, event.rows) for event in recorder.events] == [("choices", 9), ("choices", 2)]
+
+
+async def test_records_repo_source(dbsession: AsyncSession, recorder: QueryRecorder) -> None:
+    repo = UserRepo(dbsession)
+    await repo.all()
+    await repo.get_or_none(-1, "id")
+    await repo.get("user_01", "name")
+
+    assert [(event.source, event.method) for event in recorder.events] == [
+        ("UserRepo.all", "all"),
+        ("UserRepo.get_or_none", "get"),
+        ("UserRepo.get", "one"),
+    ]
+
+
+async def test_sinks(dbsession: AsyncSession, caplog: pytest.LogCaptureFixture) -> None:
+    sink = ListSink()
+    QueryRecorder([sink, LoggingSink()], capture_call_site=False).attach(dbsession)
+    try:
+        with caplog.at_level(logging.DEBUG, logger="starlette_sqlalchemy.queries"):
+            await UserRepo(dbsession).all()
+    finally:
+        dbsession.info.clear()
+
+    assert len(sink.events) == 1
+    assert sink.events[0].call_site is None
+    assert "UserRepo.all.all" in caplog.text
+
+
+def test_server_timing() -> None:
+    recorder = QueryRecorder()
+    recorder.record(QueryEvent("all", None, None, None, 0.0015, 3, None))
+    recorder.record(QueryEvent("one", None, None, None, 0.001, 1, None))
+    assert recorder.server_timing() == 'db;dur=2.50;desc="2 queries, 4 rows"'
+    assert recorder.as_dict() == {"count": 2, "elapsed": 0.0025, "rows": 4}
+
+
+class TestMiddleware:
+    async def test_collects_stats(self, dbsession_maker: async_sessionmaker[AsyncSession]) -> None:
+        messages: list[Message] = []
+        sink = ListSink()
+
+        async def app(scope: Scope, receive: Receive, send: Send) -> None:
+            await UserRepo(scope["state"]["dbsession"]).all()
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+            await send({"type": "http.response.body", "body": b""})
+            assert scope["state"]["dbstats"].count == 1
+
+        async def send(message: Message) -> None:
+            messages.append(message)
+
+        async def receive() -> Message:  # pragma: no cover
+            return {"type": "http.request", "body": b""}
+
+        middleware = DbSessionMiddleware(app, dbsession_maker, lazy=True, sinks=[sink], server_timing=True)
+        scope: Scope = {"type": "http", "method": "GET"}
+        await middleware(scope, receive, send)
+
+        recorder = scope["state"]["dbstats"]
+        assert isinstance(recorder, QueryRecorder)
+        assert sink.events == recorder.events
+        headers = dict(messages[0]["headers"])
+        assert headers[b"server-timing"].startswith(b"db;dur=")
+
+    async def test_disabled_by_default(self, dbsession_maker: async_sessionmaker[AsyncSession]) -> None:
+        async def app(scope: Scope, receive: Receive, send: Send) -> None:
+            await UserRepo(scope["state"]["dbsession"]).all()
+
+        async def receive() -> Message:  # pragma: no cover
+            return {"type": "http.request", "body": b""}
+
+        async def send(message: Message) -> None: ...
+
+        middleware = DbSessionMiddleware(app, dbsession_maker)
+        scope: Scope = {"type": "http", "method": "GET"}
+        await middleware(scope, receive, send)
+        assert "dbstats" not in scope["state"]
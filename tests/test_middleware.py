@@ -1,10 +1,13 @@
 import contextlib
 import typing
 
-from sqlalchemy.ext.asyncio import AsyncSession
+import pytest
+import sqlalchemy as sa
+from sqlalchemy.ext.asyncio import async_sessionmaker, AsyncSession, create_async_engine
 from starlette.types import Message, Receive, Send, Scope
 
-from starlette_sqlalchemy.middleware import DbSessionMiddleware
+from starlette_sqlalchemy.middleware import DbSessionMiddleware, LazySession
+from tests.models import Base, Product
 
 
 async def empty_receive() -> Message:
@@ -40,3 +43,206 @@ async def test_injects_dbsession_with_custom_key() -> None:
     scope: Scope = {}
     await middleware(scope, empty_receive, empty_send)
     assert "db" in scope["state"]
+
+
+class TestLazySession:
+    async def test_does_not_create_unused_session(self) -> None:
+        created = []
+
+        async def app(scope: Scope, receive: Receive, send: Send) -> None:
+            assert isinstance(scope["state"]["dbsession"], LazySession)
+            assert not scope["state"]["dbsession"].is_created
+
+        def session_factory() -> AsyncSession:
+            created.append(True)
+            return AsyncSession()
+
+        middleware = DbSessionMiddleware(app, session_factory, lazy=True)
+        await middleware({}, empty_receive, empty_send)
+        assert not created
+
+    async def test_creates_session_on_first_use(self, dbsession_maker: async_sessionmaker[AsyncSession]) -> None:
+        sessions: list[AsyncSession] = []
+
+        async def app(scope: Scope, receive: Receive, send: Send) -> None:
+            dbsession = scope["state"]["dbsession"]
+            assert await dbsession.scalar(sa.select(sa.literal(1))) == 1
+            assert dbsession.is_created
+            assert dbsession.get_session() is sessions[0]
+
+        def session_factory() -> AsyncSession:
+            sessions.append(dbsession_maker())
+            return sessions[-1]
+
+        middleware = DbSessionMiddleware(app, session_factory, lazy=True)
+        await middleware({}, empty_receive, empty_send)
+        assert len(sessions) == 1
+        assert not sessions[0].in_transaction()  # closed by middleware
+
+    async def test_requires_async_session_factory(self) -> None:
+        async def app(scope: Scope, receive: Receive, send: Send) -> None:
+            scope["state"]["dbsession"].info
+
+        @contextlib.asynccontextmanager
+        async def session_factory() -> typing.AsyncGenerator[AsyncSession, None]:
+            yield AsyncSession()
+
+        middleware = DbSessionMiddleware(app, session_factory, lazy=True)
+        with pytest.raises(TypeError, match="AsyncSession"):
+            await middleware({}, empty_receive, empty_send)
+
+
+async def test_skips_excluded_scope_types() -> None:
+    async def app(scope: Scope, receive: Receive, send: Send) -> None:
+        pass
+
+    @contextlib.asynccontextmanager
+    async def session_factory() -> typing.AsyncGenerator[AsyncSession, None]:
+        yield AsyncSession()
+
+    middleware = DbSessionMiddleware(app, session_factory, scope_types=["http"])
+    scope: Scope = {"type": "lifespan"}
+    await middleware(scope, empty_receive, empty_send)
+    assert "state" not in scope
+
+    scope = {"type": "http"}
+    await middleware(scope, empty_receive, empty_send)
+    assert "dbsession" in scope["state"]
+
+
+async def test_releases_session_on_response_start() -> None:
+    events: list[str] = []
+
+    async def app(scope: Scope, receive: Receive, send: Send) -> None:
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        events.append("body")
+        await send({"type": "http.response.body", "body": b""})
+
+    @contextlib.asynccontextmanager
+    async def session_factory() -> typing.AsyncGenerator[AsyncSession, None]:
+        yield AsyncSession()
+        events.append("closed")
+
+    async def send(message: Message) -> None:
+        events.append(message["type"])
+
+    middleware = DbSessionMiddleware(app, session_factory, release_on_response_start=True)
+    await middleware({"type": "http"}, empty_receive, send)
+    assert events == ["closed", "http.response.start", "body", "http.response.body"]
+
+
+
+@pytest.mark.parametrize("lazy", [True, False])
+async def test_closes_session_reopened_after_release(
+    isolated_session_maker: async_sessionmaker[AsyncSession], lazy: bool
+) -> None:
+    sessions: list[AsyncSession] = []
+
+    async def app(scope: Scope, receive: Receive, send: Send) -> None:
+        dbsession = scope["state"]["dbsession"]
+        await dbsession.execute(sa.select(Product))
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+        # like a background task that runs after the response
+        await dbsession.execute(sa.select(Product))
+        assert dbsession.in_transaction()
+        sessions.append(dbsession)
+
+    middleware = DbSessionMiddleware(app, isolated_session_maker, lazy=lazy, release_on_response_start=True)
+    await middleware({"type": "http"}, empty_receive, empty_send)
+    assert not sessions[0].in_transaction()
+
+
+@pytest.fixture
+async def isolated_session_maker() -> typing.AsyncGenerator[async_sessionmaker[AsyncSession], None]:
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield async_sessionmaker(engine)
+    await engine.dispose()
+
+
+def _product_app(
+    status: int, raise_exc: bool = False
+) -> typing.Callable[[Scope, Receive, Send], typing.Awaitable[None]]:
+    async def app(scope: Scope, receive: Receive, send: Send) -> None:
+        scope["state"]["dbsession"].add(Product(id=1, name="product"))
+        if raise_exc:
+            raise RuntimeError("boom")
+        await send({"type": "http.response.start", "status": status, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    return app
+
+
+async def _product_exists(session_maker: async_sessionmaker[AsyncSession]) -> bool:
+    async with session_maker() as dbsession:
+        return await dbsession.get(Product, 1) is not None
+
+
+class TestTransactionModes:
+    @pytest.mark.parametrize("lazy", [True, False])
+    async def test_autocommit_on_success(
+        self, isolated_session_maker: async_sessionmaker[AsyncSession], lazy: bool
+    ) -> None:
+        middleware = DbSessionMiddleware(_product_app(201), isolated_session_maker, transaction="autocommit", lazy=lazy)
+        await middleware({"type": "http"}, empty_receive, empty_send)
+        assert await _product_exists(isolated_session_maker)
+
+    async def test_autocommit_commits_before_response_start(
+        self, isolated_session_maker: async_sessionmaker[AsyncSession]
+    ) -> None:
+        committed: list[bool] = []
+
+        async def send(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                committed.append(await _product_exists(isolated_session_maker))
+
+        middleware = DbSessionMiddleware(_product_app(200), isolated_session_maker, transaction="autocommit")
+        await middleware({"type": "http"}, empty_receive, send)
+        assert committed == [True]
+
+    async def test_autocommit_rolls_back_error_status(
+        self, isolated_session_maker: async_sessionmaker[AsyncSession]
+    ) -> None:
+        middleware = DbSessionMiddleware(_product_app(400), isolated_session_maker, transaction="autocommit")
+        await middleware({"type": "http"}, empty_receive, empty_send)
+        assert not await _product_exists(isolated_session_maker)
+
+    async def test_autocommit_rolls_back_on_exception(
+        self, isolated_session_maker: async_sessionmaker[AsyncSession]
+    ) -> None:
+        middleware = DbSessionMiddleware(
+            _product_app(200, raise_exc=True), isolated_session_maker, transaction="autocommit"
+        )
+        with pytest.raises(RuntimeError):
+            await middleware({"type": "http"}, empty_receive, empty_send)
+        assert not await _product_exists(isolated_session_maker)
+
+    async def test_rollback_on_error(self, isolated_session_maker: async_sessionmaker[AsyncSession]) -> None:
+        rollbacks: list[bool] = []
+
+        async def app(scope: Scope, receive: Receive, send: Send) -> None:
+            dbsession = scope["state"]["dbsession"]
+            await dbsession.scalar(sa.select(sa.literal(1)))
+            sa.event.listen(dbsession.sync_session, "after_rollback", lambda session: rollbacks.append(True))
+            await send({"type": "http.response.start", "status": 500, "headers": []})
+
+        middleware = DbSessionMiddleware(app, isolated_session_maker, transaction="rollback_on_error")
+        await middleware({"type": "http"}, empty_receive, empty_send)
+        assert rollbacks == [True]
+
+    async def test_skips_round_trip_without_transaction(
+        self, isolated_session_maker: async_sessionmaker[AsyncSession]
+    ) -> None:
+        events: list[str] = []
+
+        async def app(scope: Scope, receive: Receive, send: Send) -> None:
+            dbsession = scope["state"]["dbsession"]
+            sa.event.listen(dbsession.sync_session, "after_commit", lambda session: events.append("commit"))
+            sa.event.listen(dbsession.sync_session, "after_rollback", lambda session: events.append("rollback"))
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+
+        middleware = DbSessionMiddleware(app, isolated_session_maker, transaction="autocommit")
+        await middleware({"type": "http"}, empty_receive, empty_send)
+        assert events == []
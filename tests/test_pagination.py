@@ -1,10 +1,25 @@
+import datetime
+import decimal
+import pathlib
+
 import pytest
 import sqlalchemy as sa
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import async_sessionmaker, AsyncSession, create_async_engine
 from starlette.requests import Request
 
-from starlette_sqlalchemy.pagination import get_page_size_value, get_page_value, Page, PageNumberPaginator, SlidingStyle
-from tests.models import User
+from starlette_sqlalchemy.pagination import (
+    CursorError,
+    decode_cursor,
+    encode_cursor,
+    get_page_size_value,
+    get_page_value,
+    KeysetPage,
+    KeysetPaginator,
+    Page,
+    PageNumberPaginator,
+    SlidingStyle,
+)
+from tests.models import Base, User
 
 
 class TestPage:
@@ -71,6 +86,15 @@ class TestPage:
         page = Page([x for x in range(200)], total=200, page_size=10, page=1, style=SlidingStyle())
         assert list(page.iter_pages()) == [1, 2, 3, 4]
 
+    def test_inexact_total(self) -> None:
+        page = Page([1, 2], total=4, page=2, page_size=2, total_is_exact=False)
+        assert page.has_next
+        assert page.next_page == 3
+        assert page.display_total == "4+"
+
+        page = Page([1], total=4, page=3, page_size=2, total_is_exact=False)
+        assert not page.has_next
+
     def test_page_repr(self) -> None:
         rows = [1, 2]
         page = Page(rows, total=2, page=1, page_size=2)
@@ -81,6 +105,13 @@ class TestPage:
         page = Page(rows, total=2, page=1, page_size=2)
         assert str(page) == "Page 1 of 1, rows 1 - 2 of 2."
 
+    def test_shares_rows(self) -> None:
+        rows = [1, 2, 3]
+        page = Page(rows, total=3, page=1, page_size=10)
+        assert page.rows is rows
+        assert not hasattr(page, "__dict__")
+        assert not hasattr(KeysetPage(rows, page_size=10), "__dict__")
+
 
 class TestSlidingPaginationStyle:
     def test_current_in_the_middle(self) -> None:
@@ -173,6 +204,14 @@ class TestPageNumberPaginator:
         page = await paginator.paginate_from_request(request, stmt, page_size=2, page_size_param="ps")
         assert page.total_pages == 5
 
+    async def test_default_page_size(self, dbsession: AsyncSession) -> None:
+        stmt = sa.select(User).order_by(User.id)
+        paginator = PageNumberPaginator(dbsession)
+
+        request = Request(scope={"type": "http", "query_string": b"page=2"})
+        page = await paginator.paginate_from_request(request, stmt, page_size=2)
+        assert [user.id for user in page] == [3, 4]
+
     async def test_max_page_size(self, dbsession: AsyncSession) -> None:
         stmt = sa.select(User).order_by(User.id)
         paginator = PageNumberPaginator(dbsession)
@@ -185,3 +224,126 @@ class TestPageNumberPaginator:
         )
         page = await paginator.paginate_from_request(request, stmt, page_size=2, max_page_size=2)
         assert page.total_pages == 5
+
+
+class TestPageNumberPaginatorCountModes:
+    async def test_window_count(self, dbsession: AsyncSession) -> None:
+        stmt = sa.select(User).order_by(User.id)
+        paginator = PageNumberPaginator(dbsession, count_mode="window")
+        page = await paginator.paginate(stmt, page=2, page_size=2)
+        assert page.total == 9
+        assert [user.id for user in page] == [3, 4]
+
+    async def test_window_count_out_of_range_page(self, dbsession: AsyncSession) -> None:
+        stmt = sa.select(User).order_by(User.id)
+        paginator = PageNumberPaginator(dbsession, count_mode="window")
+        page = await paginator.paginate(stmt, page=20, page_size=2)
+        assert page.total == 9
+        assert len(page) == 0
+
+    async def test_window_count_empty_result(self, dbsession: AsyncSession) -> None:
+        stmt = sa.select(User).where(User.id == -1)
+        paginator = PageNumberPaginator(dbsession, count_mode="window")
+        page = await paginator.paginate(stmt, page=1, page_size=2)
+        assert page.total == 0
+
+    async def test_window_count_distinct(self, dbsession: AsyncSession) -> None:
+        stmt = sa.select((User.id % 3).label("group")).distinct().order_by("group")
+        paginator = PageNumberPaginator(dbsession, count_mode="window")
+        page = await paginator.paginate(stmt, page=1, page_size=2)
+        assert page.total == 3
+        assert list(page) == [0, 1]
+
+    async def test_concurrent_count(self, tmp_path: pathlib.Path) -> None:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'db.sqlite'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            await conn.execute(
+                sa.insert(User), [{"id": i, "name": f"user_{i}", "email": f"{i}@user"} for i in range(5)]
+            )
+
+        session_factory = async_sessionmaker(engine)
+        async with session_factory() as dbsession:
+            stmt = sa.select(User).order_by(User.id)
+            paginator = PageNumberPaginator(dbsession, count_mode="concurrent", session_factory=session_factory)
+            page = await paginator.paginate(stmt, page=1, page_size=2)
+            assert page.total == 5
+            assert [user.id for user in page] == [0, 1]
+        await engine.dispose()
+
+    def test_concurrent_count_requires_session_factory(self, dbsession: AsyncSession) -> None:
+        with pytest.raises(ValueError, match="session_factory"):
+            PageNumberPaginator(dbsession, count_mode="concurrent")
+
+
+class TestKeysetPaginator:
+    async def test_paginates_forward(self, dbsession: AsyncSession) -> None:
+        paginator = KeysetPaginator(dbsession)
+        page = await paginator.paginate(sa.select(User), [User.id], page_size=4)
+        assert [user.id for user in page] == [1, 2, 3, 4]
+        assert page.has_next
+        assert not page.has_previous
+
+        page = await paginator.paginate(sa.select(User), [User.id], page_size=4, cursor=page.next_cursor)
+        assert [user.id for user in page] == [5, 6, 7, 8]
+        assert page.has_next
+        assert page.has_previous
+
+        page = await paginator.paginate(sa.select(User), [User.id], page_size=4, cursor=page.next_cursor)
+        assert [user.id for user in page] == [9]
+        assert not page.has_next
+        assert page.has_previous
+
+    async def test_paginates_backward(self, dbsession: AsyncSession) -> None:
+        paginator = KeysetPaginator(dbsession)
+        cursor = encode_cursor([9], backwards=True)
+        page = await paginator.paginate(sa.select(User), [User.id], page_size=4, cursor=cursor)
+        assert [user.id for user in page] == [5, 6, 7, 8]
+        assert page.has_next
+        assert page.has_previous
+
+        page = await paginator.paginate(sa.select(User), [User.id], page_size=4, cursor=page.previous_cursor)
+        assert [user.id for user in page] == [1, 2, 3, 4]
+        assert page.has_next
+        assert not page.has_previous
+
+    async def test_multiple_columns(self, dbsession: AsyncSession) -> None:
+        paginator = KeysetPaginator(dbsession)
+        page = await paginator.paginate(sa.select(User), [User.name, User.id], page_size=5, descending=True)
+        assert [user.id for user in page] == [9, 8, 7, 6, 5]
+
+        page = await paginator.paginate(
+            sa.select(User), [User.name, User.id], page_size=5, cursor=page.next_cursor, descending=True
+        )
+        assert [user.id for user in page] == [4, 3, 2, 1]
+        assert not page.has_next
+
+    async def test_invalid_cursor(self, dbsession: AsyncSession) -> None:
+        paginator = KeysetPaginator(dbsession)
+        with pytest.raises(CursorError):
+            await paginator.paginate(sa.select(User), [User.id], page_size=4, cursor="garbage")
+
+    async def test_paginates_from_request_object(self, dbsession: AsyncSession) -> None:
+        paginator = KeysetPaginator(dbsession)
+        cursor = encode_cursor([3])
+        request = Request(scope={"type": "http", "query_string": f"cursor={cursor}&page_size=2".encode()})
+        page = await paginator.paginate_from_request(request, sa.select(User), [User.id])
+        assert [user.id for user in page] == [4, 5]
+
+    async def test_default_page_size_from_request(self, dbsession: AsyncSession) -> None:
+        paginator = KeysetPaginator(dbsession)
+        request = Request(scope={"type": "http", "query_string": b""})
+        page = await paginator.paginate_from_request(request, sa.select(User), [User.id], page_size=2)
+        assert [user.id for user in page] == [1, 2]
+        assert page.next_cursor is not None
+
+    async def test_ignores_invalid_cursor_in_request(self, dbsession: AsyncSession) -> None:
+        paginator = KeysetPaginator(dbsession)
+        request = Request(scope={"type": "http", "query_string": b"cursor=garbage&page_size=2"})
+        page = await paginator.paginate_from_request(request, sa.select(User), [User.id])
+        assert [user.id for user in page] == [1, 2]
+
+
+def test_cursor_roundtrip() -> None:
+    values = [1, "a", datetime.datetime(2024, 1, 1, 12), datetime.date(2024, 1, 1), decimal.Decimal("1.5")]
+    assert decode_cursor(encode_cursor(values, backwards=True)) == (values, True)
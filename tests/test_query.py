@@ -1,8 +1,11 @@
+import typing
+
 import pytest
 import sqlalchemy as sa
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
 
-from starlette_sqlalchemy.query import MultipleResultsError, NoResultError, query
+from starlette_sqlalchemy.collection import LazyCollection
+from starlette_sqlalchemy.query import MultipleResultsError, NoResultError, query, QueryError
 from tests.models import User
 
 
@@ -65,6 +68,84 @@ async def test_iterator(dbsession: AsyncSession) -> None:
     assert [1, 2, 3] == [model.id async for model in iterator]
 
 
+class TestValues:
+    async def test_values(self, dbsession: AsyncSession) -> None:
+        stmt = sa.select(User).where(User.id < 3)
+        rows = await query(dbsession).values(stmt, User.id, "name")
+        assert [tuple(row) for row in rows] == [(1, "user_01"), (2, "user_02")]
+
+    async def test_values_does_not_load_objects(self, dbsession: AsyncSession) -> None:
+        dbsession.expunge_all()
+        await query(dbsession).values(sa.select(User), User.id)
+        assert len(dbsession.identity_map) == 0
+
+    async def test_values_without_columns(self, dbsession: AsyncSession) -> None:
+        rows = await query(dbsession).values(sa.select(User.id, User.email).where(User.id == 1))
+        assert [tuple(row) for row in rows] == [(1, "01@user")]
+
+    async def test_values_unknown_attribute(self, dbsession: AsyncSession) -> None:
+        with pytest.raises(QueryError):
+            await query(dbsession).values(sa.select(User), "unknown")
+
+    async def test_mappings(self, dbsession: AsyncSession) -> None:
+        rows = await query(dbsession).mappings(sa.select(User.id, User.name).where(User.id == 1))
+        assert [dict(row) for row in rows] == [{"id": 1, "name": "user_01"}]
+
+    async def test_mappings_expands_entity(self, dbsession: AsyncSession) -> None:
+        dbsession.expunge_all()
+        rows = await query(dbsession).mappings(sa.select(User).where(User.id == 1))
+        assert [dict(row) for row in rows] == [{"id": 1, "name": "user_01", "email": "01@user"}]
+        assert len(dbsession.identity_map) == 0
+
+
+async def test_columnar(dbsession: AsyncSession) -> None:
+    dbsession.expunge_all()
+    collection = await query(dbsession).columnar(sa.select(User).where(User.id < 4), use_numpy=False)
+    assert list(collection.column("id")) == [1, 2, 3]
+    assert collection.column("name") == ["user_01", "user_02", "user_03"]
+    assert collection.sum("id") == 6
+    assert len(dbsession.identity_map) == 0
+
+
+class TestIterator:
+    async def test_tuples(self, dbsession: AsyncSession) -> None:
+        stmt = sa.select(User.id, User.name).limit(2)
+        rows = [tuple(row) async for row in query(dbsession).iterator(stmt, rows="tuples")]
+        assert rows == [(1, "user_01"), (2, "user_02")]
+
+    async def test_mappings(self, dbsession: AsyncSession) -> None:
+        stmt = sa.select(User.id, User.name).limit(2)
+        rows = [dict(row) async for row in query(dbsession).iterator(stmt, rows="mappings")]
+        assert rows == [{"id": 1, "name": "user_01"}, {"id": 2, "name": "user_02"}]
+
+    async def test_partitions(self, dbsession: AsyncSession) -> None:
+        stmt = sa.select(User.id).limit(5)
+        partitions = [list(partition) async for partition in query(dbsession).partitions(stmt, batch_size=2)]
+        assert partitions == [[1, 2], [3, 4], [5]]
+
+    async def test_expunge(self, dbsession: AsyncSession) -> None:
+        stmt = sa.select(User).limit(3)
+        models = [model async for model in query(dbsession).iterator(stmt, batch_size=2, expunge=True)]
+        assert [model.id for model in models] == [1, 2, 3]
+        assert not any(model in dbsession for model in models)
+
+    async def test_expunge_tuples(self, dbsession: AsyncSession) -> None:
+        stmt = sa.select(User, User.name).limit(2)
+        rows = [row async for row in query(dbsession).iterator(stmt, rows="tuples", expunge=True)]
+        assert rows[0][1] == "user_01"
+        assert not any(row[0] in dbsession for row in rows)
+
+    async def test_lazy_pipeline(self, dbsession: AsyncSession) -> None:
+        pipeline = LazyCollection(query(dbsession).iterator(sa.select(User), batch_size=2))
+        emails = await pipeline.filter(lambda user: user.id % 2 == 0).pluck("email").take(2).acollect()
+        assert emails == ["02@user", "04@user"]
+
+    async def test_keeps_objects_in_session_by_default(self, dbsession: AsyncSession) -> None:
+        stmt = sa.select(User).limit(2)
+        models = [model async for model in query(dbsession).iterator(stmt)]
+        assert all(model in dbsession for model in models)
+
+
 async def test_exists(dbsession: AsyncSession) -> None:
     stmt = sa.select(User).where(User.id == 1)
     assert await query(dbsession).exists(stmt) is True
@@ -94,6 +175,26 @@ class TestChoices:
         ]
         assert choices == [(1, "user_01"), (2, "user_02"), (3, "user_03")]
 
+    async def test_choices_string_keys_fetch_only_columns(self, dbsession: AsyncSession, dbengine: AsyncEngine) -> None:
+        statements: list[str] = []
+
+        def on_execute(*args: typing.Any) -> None:
+            statements.append(args[2])
+
+        sa.event.listen(dbengine.sync_engine, "before_cursor_execute", on_execute)
+        try:
+            stmt = sa.select(User).where(User.id < 3).order_by(User.id.desc())
+            choices = [choice async for choice in query(dbsession).choices(stmt, label_attr="email", value_attr="id")]
+        finally:
+            sa.event.remove(dbengine.sync_engine, "before_cursor_execute", on_execute)
+        assert choices == [(2, "02@user"), (1, "01@user")]
+        assert "users.name" not in statements[0]
+
+    async def test_choices_non_column_attribute(self, dbsession: AsyncSession) -> None:
+        stmt = sa.select(User).limit(1)
+        choices = [choice async for choice in query(dbsession).choices(stmt, label_attr="profile", value_attr="id")]
+        assert choices[0][1].bio == "bio_01"
+
     async def test_choices_callable_keys(self, dbsession: AsyncSession) -> None:
         stmt = sa.select(User).limit(3)
         choices = [
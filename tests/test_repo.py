@@ -1,10 +1,18 @@
+import asyncio
+import collections
+import pathlib
+import types
+import typing
+
 import pytest
 import sqlalchemy as sa
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.dialects import registry
+from sqlalchemy.ext.asyncio import async_sessionmaker, AsyncEngine, AsyncSession, create_async_engine
 
-from starlette_sqlalchemy.query import MultipleResultsError, NoResultError
+from starlette_sqlalchemy.query import MultipleResultsError, NoResultError, Query
+from starlette_sqlalchemy import repos
 from starlette_sqlalchemy.repos import Repo, RepoError, RepoFilter
-from tests.models import User
+from tests.models import Base, Product, User
 
 
 class UserRepo(Repo[User]):
@@ -166,3 +174,400 @@ class TestOneOrRaise:
     async def test_multiple_rows(self, user_repo: UserRepo) -> None:
         with pytest.raises(MultipleResultsError):
             await user_repo.one_or_raise(ByNameLike("user"), ValueError("User not found"))
+
+
+class TestLoad:
+    async def test_batches_concurrent_calls(self, user_repo: UserRepo, dbengine: AsyncEngine) -> None:
+        statements: list[str] = []
+
+        def on_execute(*args: typing.Any) -> None:
+            statements.append(args[2])
+
+        sa.event.listen(dbengine.sync_engine, "before_cursor_execute", on_execute)
+        try:
+            users = await asyncio.gather(user_repo.load(3), user_repo.load(1), user_repo.load(3))
+        finally:
+            sa.event.remove(dbengine.sync_engine, "before_cursor_execute", on_execute)
+
+        assert [user.id for user in users] == [3, 1, 3]
+        assert len(statements) == 1
+        assert " IN " in statements[0]
+
+    async def test_load_no_result(self, user_repo: UserRepo) -> None:
+        with pytest.raises(NoResultError):
+            await user_repo.load(-1)
+
+    async def test_load_or_none(self, user_repo: UserRepo) -> None:
+        users = await asyncio.gather(user_repo.load_or_none(2), user_repo.load_or_none(-1))
+        assert users[0] is not None
+        assert users[0].id == 2
+        assert users[1] is None
+
+    async def test_load_custom_column(self, user_repo: UserRepo) -> None:
+        user = await user_repo.load("02@user", pk_column=User.email)
+        assert user.id == 2
+
+    async def test_loader_is_shared_per_session(self, user_repo: UserRepo, dbsession: AsyncSession) -> None:
+        assert user_repo.get_loader() is UserRepo(dbsession).get_loader("id")
+
+    async def test_runs_one_batch_at_a_time(self, user_repo: UserRepo, monkeypatch: pytest.MonkeyPatch) -> None:
+        events: list[str] = []
+        all_ = Query.all
+
+        async def traced_all(self: Query, stmt: sa.Select[typing.Any], params: typing.Any = None) -> typing.Any:
+            events.append("start")
+            await asyncio.sleep(0.01)
+            try:
+                return await all_(self, stmt, params)
+            finally:
+                events.append("end")
+
+        async def load_later() -> User:
+            await asyncio.sleep(0.005)  # while the first batch is being loaded
+            return await user_repo.load(3)
+
+        monkeypatch.setattr(Query, "all", traced_all)
+        users = await asyncio.gather(user_repo.load(1), load_later(), load_later())
+        assert [user.id for user in users] == [1, 3, 3]
+        assert events == ["start", "end", "start", "end"]
+
+    async def test_loaders_of_session_share_lock(
+        self, user_repo: UserRepo, dbsession: AsyncSession, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        running = peak = 0
+        all_ = Query.all
+
+        async def traced_all(self: Query, stmt: sa.Select[typing.Any], params: typing.Any = None) -> typing.Any:
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            try:
+                return await all_(self, stmt, params)
+            finally:
+                running -= 1
+
+        monkeypatch.setattr(Query, "all", traced_all)
+        users = await asyncio.gather(user_repo.load(1), ProfileRepo(dbsession).load(2), user_repo.load(3, "id"))
+        assert [user.id for user in users] == [1, 2, 3]
+        assert peak == 1
+
+    async def test_propagates_errors(self, user_repo: UserRepo) -> None:
+        loader = user_repo.get_loader()
+        loader.stmt = sa.select(User).where(sa.text("missing_column = 1"))
+        with pytest.raises(sa.exc.OperationalError):
+            await asyncio.gather(user_repo.load(1), user_repo.load(2))
+
+
+class TestGetMany:
+    async def test_get_many(self, user_repo: UserRepo) -> None:
+        users = await user_repo.get_many([3, 1, -1, 2, 3])
+        assert [user.id for user in users] == [3, 1, 2, 3]
+
+    async def test_get_many_custom_column(self, user_repo: UserRepo) -> None:
+        users = await user_repo.get_many(["02@user", "01@user"], pk_column=User.email)
+        assert [user.id for user in users] == [2, 1]
+
+    async def test_get_map(self, user_repo: UserRepo) -> None:
+        users = await user_repo.get_map([3, 1, -1])
+        assert {key: user.id for key, user in users.items()} == {3: 3, 1: 1}
+
+    async def test_splits_keys_into_batches(self, user_repo: UserRepo, dbengine: AsyncEngine) -> None:
+        statements: list[str] = []
+
+        def on_execute(*args: typing.Any) -> None:
+            statements.append(args[2])
+
+        sa.event.listen(dbengine.sync_engine, "before_cursor_execute", on_execute)
+        try:
+            users = await user_repo.get_many(range(1, 10), batch_size=4)
+        finally:
+            sa.event.remove(dbengine.sync_engine, "before_cursor_execute", on_execute)
+
+        assert [user.id for user in users] == list(range(1, 10))
+        assert len(statements) == 3
+
+    async def test_concurrent_batches(self, tmp_path: pathlib.Path) -> None:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'db.sqlite'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            await conn.execute(
+                sa.insert(User), [{"id": i, "name": f"user_{i}", "email": f"{i}@user"} for i in range(10)]
+            )
+
+        session_factory = async_sessionmaker(engine)
+        async with session_factory() as dbsession:
+            users = await UserRepo(dbsession).get_many([9, 0, 5, 3], batch_size=2, session_factory=session_factory)
+            assert [user.id for user in users] == [9, 0, 5, 3]
+        await engine.dispose()
+
+
+class TestIdentityMapLookup:
+    async def test_get_uses_identity_map(self, user_repo: UserRepo, dbengine: AsyncEngine) -> None:
+        statements: list[str] = []
+
+        def on_execute(*args: typing.Any) -> None:
+            statements.append(args[2])
+
+        user = await user_repo.get(1)
+        sa.event.listen(dbengine.sync_engine, "before_cursor_execute", on_execute)
+        try:
+            assert await user_repo.get(1) is user
+            assert await user_repo.get_or_none(1) is user
+            assert await user_repo.get(1, pk_column=User.id) is user
+        finally:
+            sa.event.remove(dbengine.sync_engine, "before_cursor_execute", on_execute)
+        assert statements == []
+
+    async def test_get_loads_missing_objects(self, user_repo: UserRepo, dbsession: AsyncSession) -> None:
+        dbsession.expunge_all()
+        user = await user_repo.get(3)
+        assert user.id == 3
+
+        with pytest.raises(NoResultError):
+            await user_repo.get(-1)
+
+    async def test_get_skips_deleted_objects(self, user_repo: UserRepo, dbsession: AsyncSession) -> None:
+        user = await user_repo.get(1)
+        await dbsession.delete(user)
+        assert await user_repo.get_or_none(1) is None
+        with pytest.raises(NoResultError):
+            await user_repo.get(1)
+
+    async def test_custom_base_query_is_respected(self, dbsession: AsyncSession) -> None:
+        class ModelRepo(Repo[User]):
+            model_class = User
+            base_query = sa.select(User).where(User.id > 8)
+
+        assert await dbsession.get(User, 1) is not None  # in the identity map
+        with pytest.raises(NoResultError):
+            await ModelRepo(dbsession).get(1)
+
+    async def test_overridden_base_query_is_respected(self, dbsession: AsyncSession) -> None:
+        class ModelRepo(Repo[User]):
+            model_class = User
+
+            def get_base_query(self) -> sa.Select[tuple[User]]:
+                return sa.select(User).where(User.id > 8)
+
+        with pytest.raises(NoResultError):
+            await ModelRepo(dbsession).get(1)
+
+
+class ProfileRepo(Repo[User]):
+    model_class = User
+    default_options = [sa.orm.selectinload(User.profile)]
+    load_profiles = {"lazy": [sa.orm.lazyload(User.profile)], "by_name": [sa.orm.defer(User.name)]}
+
+
+def is_loaded(user: User, attr: str) -> bool:
+    return attr not in sa.inspect(user).unloaded
+
+
+class TestLoadProfiles:
+    async def test_default_options(self, dbsession: AsyncSession) -> None:
+        dbsession.expunge_all()
+        users = await ProfileRepo(dbsession).all()
+        assert all(is_loaded(user, "profile") for user in users)
+
+        dbsession.expunge_all()
+        user = await ProfileRepo(dbsession).one(ByEmail("02@user"))
+        assert is_loaded(user, "profile")
+
+    async def test_default_options_apply_to_get(self, dbsession: AsyncSession) -> None:
+        dbsession.expunge_all()
+        user = await ProfileRepo(dbsession).get(2)
+        assert is_loaded(user, "profile")
+
+        dbsession.expunge_all()
+        user = await ProfileRepo(dbsession).load(3)
+        assert is_loaded(user, "profile")
+
+    async def test_with_profile(self, dbsession: AsyncSession) -> None:
+        dbsession.expunge_all()
+        repo = ProfileRepo(dbsession)
+        detail_repo = repo.with_profile("by_name")
+        assert detail_repo is not repo
+        assert detail_repo.profile == "by_name"
+        assert repo.profile is None
+
+        user = await detail_repo.get_or_none(1)
+        assert user is not None
+        assert is_loaded(user, "profile")
+        assert not is_loaded(user, "name")
+
+    async def test_get_applies_options_to_loaded_objects(self, dbsession: AsyncSession) -> None:
+        dbsession.expunge_all()
+        user = await UserRepo(dbsession).get(1)
+        assert not is_loaded(user, "profile")
+
+        assert await ProfileRepo(dbsession).with_profile("by_name").get(1) is user
+        assert is_loaded(user, "profile")
+
+    async def test_profiles_have_own_loaders(self, dbsession: AsyncSession) -> None:
+        repo = ProfileRepo(dbsession)
+        assert repo.get_loader() is not repo.with_profile("lazy").get_loader()
+
+    async def test_unknown_profile(self, dbsession: AsyncSession) -> None:
+        with pytest.raises(RepoError, match="Unknown load profile 'missing'"):
+            ProfileRepo(dbsession).with_profile("missing")
+
+
+class ByNameParam(RepoFilter[User]):
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    def apply(self, stmt: sa.Select[tuple[User]]) -> sa.Select[tuple[User]]:
+        return stmt.where(User.name == sa.bindparam("name"))
+
+    def cache_key(self) -> typing.Hashable:
+        return ByNameParam
+
+    def get_params(self) -> dict[str, typing.Any]:
+        return {"name": self.name}
+
+
+class MaxIdParam(RepoFilter[User]):
+    def __init__(self, max_id: int) -> None:
+        self.max_id = max_id
+
+    def apply(self, stmt: sa.Select[tuple[User]]) -> sa.Select[tuple[User]]:
+        return stmt.where(User.id <= sa.bindparam("max_id"))
+
+    def cache_key(self) -> typing.Hashable:
+        return MaxIdParam
+
+    def get_params(self) -> dict[str, typing.Any]:
+        return {"max_id": self.max_id}
+
+
+class CachedUserRepo(Repo[User]):
+    model_class = User
+    cache_statements = True
+
+
+class TestStatementCache:
+    async def test_reuses_filter_statements(self, dbsession: AsyncSession) -> None:
+        statements: list[sa.Executable] = []
+
+        def on_execute(orm_execute_state: sa.orm.ORMExecuteState) -> None:
+            statements.append(orm_execute_state.statement)
+
+        repo = CachedUserRepo(dbsession)
+        sa.event.listen(dbsession.sync_session, "do_orm_execute", on_execute)
+        try:
+            assert (await repo.one(ByNameParam("user_02"))).id == 2
+            assert (await repo.one_or_none(ByNameParam("user_03"))).id == 3  # type: ignore[union-attr]
+            assert [user.id for user in await CachedUserRepo(dbsession).all(ByNameParam("user_04"))] == [4]
+        finally:
+            sa.event.remove(dbsession.sync_session, "do_orm_execute", on_execute)
+        assert statements[0] is statements[1] is statements[2]
+
+    async def test_composite_filters(self, dbsession: AsyncSession) -> None:
+        repo = CachedUserRepo(dbsession)
+        assert [user.id for user in await repo.all(MaxIdParam(3) & ByNameParam("user_02"))] == [2]
+        assert [user.id for user in await repo.all(MaxIdParam(3) & ByNameParam("user_05"))] == []
+        assert [user.id for user in await repo.all(MaxIdParam(3) & ByEmail("01@user"))] == [1]
+        assert (MaxIdParam(3) & ByEmail("01@user")).cache_key() is None
+
+    async def test_get(self, dbsession: AsyncSession) -> None:
+        repo = CachedUserRepo(dbsession)
+        assert (await repo.get("02@user", pk_column="email")).id == 2
+        assert (await repo.get("03@user", pk_column=User.email)).id == 3
+        with pytest.raises(NoResultError):
+            await repo.get("missing", pk_column="email")
+
+    async def test_get_many(self, dbsession: AsyncSession) -> None:
+        repo = CachedUserRepo(dbsession)
+        users = await repo.get_many([3, 1, 2, 4], batch_size=3)
+        assert [user.id for user in users] == [3, 1, 2, 4]
+
+    @pytest.mark.parametrize("repo_class", [UserRepo, CachedUserRepo])
+    async def test_shared_placeholder_names(self, dbsession: AsyncSession, repo_class: type[Repo[User]]) -> None:
+        repo = repo_class(dbsession)
+
+        async def ids(filter_: RepoFilter[User]) -> list[int]:
+            return sorted(user.id for user in await repo.all(filter_))
+
+        assert await ids(ByNameParam("user_02") | ByNameParam("user_03")) == [2, 3]
+        assert await ids(ByNameParam("user_02") & ~ByNameParam("user_03")) == [2]
+        assert await ids(ByNameParam("user_02") & ByNameParam("user_03")) == []
+        assert await ids((ByNameParam("user_02") | ByNameParam("user_03")) & ~ByNameParam("user_03")) == [2]
+        assert await ids(ByNameParam("user_04") | ByNameParam("user_05") | MaxIdParam(1)) == [1, 4, 5]
+
+    async def test_evicts_least_recently_used_statements(
+        self, dbsession: AsyncSession, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        monkeypatch.setattr(repos, "_MAX_STATEMENTS", 2)
+        monkeypatch.setattr(repos, "_statements", collections.OrderedDict())
+        repo = CachedUserRepo(dbsession)
+        await repo.all(ByNameParam("user_01"))
+        await repo.all(MaxIdParam(1))
+        await repo.all(ByNameParam("user_02"))
+        await repo.get("01@user", pk_column="email")
+        assert [key[2:] for key in repos._statements] == [
+            ("filter", ByNameParam("user_01").cache_key()),
+            ("get", User, "email"),
+        ]
+
+    async def test_parametrized_filters_without_cache(self, user_repo: UserRepo) -> None:
+        assert (await user_repo.one(ByNameParam("user_02"))).id == 2
+        assert [user.id for user in await user_repo.all(ByNameParam("user_03"))] == [3]
+        assert user_repo.get_filtered_query(ByNameParam("user_04")).compile().params == {"name": "user_04"}
+
+
+class ProductRepo(Repo[Product]):
+    model_class = Product
+
+
+async def get_products(dbsession: AsyncSession) -> list[tuple[int, str]]:
+    result = await dbsession.execute(sa.select(Product.id, Product.name).order_by(Product.id))
+    return list(result.tuples())
+
+
+class TestBulkWrites:
+    async def test_bulk_insert(self, dbsession: AsyncSession) -> None:
+        repo = ProductRepo(dbsession)
+        keys = await repo.bulk_insert(
+            ({"name": f"product_{index}"} for index in range(5)), batch_size=2, returning=True
+        )
+        assert keys == [1, 2, 3, 4, 5]
+        assert await repo.bulk_insert([{"id": 10, "name": "product_10"}]) == []
+        assert (await get_products(dbsession))[-1] == (10, "product_10")
+        assert not [key for key in dbsession.identity_map.keys() if key[0] is Product]
+
+    async def test_bulk_upsert(self, dbsession: AsyncSession) -> None:
+        repo = ProductRepo(dbsession)
+        await repo.bulk_insert([{"id": 1, "name": "one"}, {"id": 2, "name": "two"}])
+
+        keys = await repo.bulk_upsert(
+            [{"id": 2, "name": "updated"}, {"id": 3, "name": "three"}], conflict_columns=["id"], returning=True
+        )
+        assert keys == [2, 3]
+        assert await get_products(dbsession) == [(1, "one"), (2, "updated"), (3, "three")]
+
+        await repo.bulk_upsert([{"id": 1, "name": "ignored"}], conflict_columns=["id"], update_columns=[])
+        assert (await get_products(dbsession))[0] == (1, "one")
+        assert await repo.bulk_upsert([], conflict_columns=["id"]) == []
+
+    async def test_bulk_upsert_mysql(self, dbsession: AsyncSession, monkeypatch: pytest.MonkeyPatch) -> None:
+        repo = ProductRepo(dbsession)
+        bind = types.SimpleNamespace(dialect=types.SimpleNamespace(name="mysql"))
+        monkeypatch.setattr(dbsession, "get_bind", lambda **kwargs: bind)
+        stmt = repo._get_upsert_statement(["id"], ["name"])
+        assert "ON DUPLICATE KEY UPDATE name = VALUES(name)" in str(stmt.compile(dialect=registry.load("mysql")()))
+        stmt = repo._get_upsert_statement(["name"], [])
+        assert "ON DUPLICATE KEY UPDATE name = products.name" in str(stmt.compile(dialect=registry.load("mysql")()))
+
+        bind.dialect.name = "oracle"
+        with pytest.raises(RepoError, match="'oracle'"):
+            await repo.bulk_upsert([{"id": 1, "name": "one"}], conflict_columns=["id"])
+
+    async def test_bulk_update(self, dbsession: AsyncSession) -> None:
+        repo = ProductRepo(dbsession)
+        await repo.bulk_insert([{"id": 1, "name": "one"}, {"id": 2, "name": "two"}, {"id": 3, "name": "three"}])
+        product = await repo.get(1)
+
+        await repo.bulk_update([{"id": 1, "name": "first"}, {"id": 3, "name": "third"}], batch_size=1)
+        assert await get_products(dbsession) == [(1, "first"), (2, "two"), (3, "third")]
+        assert product.name == "first"
@@ -0,0 +1,107 @@
+import typing
+
+import pytest
+import sqlalchemy as sa
+from sqlalchemy.ext.asyncio import async_sessionmaker, AsyncEngine, AsyncSession, create_async_engine
+from starlette.types import Message, Receive, Scope, Send
+
+from starlette_sqlalchemy.middleware import DbSessionMiddleware
+from starlette_sqlalchemy.query import query
+from starlette_sqlalchemy.routing import is_replica_request, READ_ONLY_KEY, RoutingSession, use_primary, use_replica
+from tests.models import Base, User
+
+
+async def _create_engine(user_name: str) -> AsyncEngine:
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(sa.insert(User), [{"id": 1, "name": user_name, "email": "01@user"}])
+    return engine
+
+
+@pytest.fixture
+async def routing_session_maker() -> typing.AsyncGenerator[async_sessionmaker[AsyncSession], None]:
+    primary = await _create_engine("primary")
+    replica = await _create_engine("replica")
+    yield async_sessionmaker(primary, sync_session_class=RoutingSession, replicas=[replica])
+    await primary.dispose()
+    await replica.dispose()
+
+
+async def _read_name(dbsession: AsyncSession) -> str:
+    return await query(dbsession).one(sa.select(User.name).where(User.id == 1))
+
+
+class TestRoutingSession:
+    async def test_uses_primary_by_default(self, routing_session_maker: async_sessionmaker[AsyncSession]) -> None:
+        async with routing_session_maker() as dbsession:
+            assert await _read_name(dbsession) == "primary"
+
+    async def test_reads_from_replica(self, routing_session_maker: async_sessionmaker[AsyncSession]) -> None:
+        async with routing_session_maker() as dbsession:
+            dbsession.info[READ_ONLY_KEY] = True
+            assert await _read_name(dbsession) == "replica"
+
+    async def test_switches_to_primary_after_flush(
+        self, routing_session_maker: async_sessionmaker[AsyncSession]
+    ) -> None:
+        async with routing_session_maker() as dbsession:
+            dbsession.info[READ_ONLY_KEY] = lambda: True
+            assert await _read_name(dbsession) == "replica"
+
+            dbsession.add(User(id=2, name="new", email="02@user"))
+            await dbsession.flush()
+            assert await _read_name(dbsession) == "primary"
+            assert await query(dbsession).count(sa.select(User)) == 2
+
+    async def test_switches_to_primary_after_dml(self, routing_session_maker: async_sessionmaker[AsyncSession]) -> None:
+        async with routing_session_maker() as dbsession:
+            dbsession.info[READ_ONLY_KEY] = True
+            await dbsession.execute(sa.update(User).values(name="updated"))
+            assert await _read_name(dbsession) == "updated"
+
+    async def test_locking_reads_use_primary(self, routing_session_maker: async_sessionmaker[AsyncSession]) -> None:
+        async with routing_session_maker() as dbsession:
+            dbsession.info[READ_ONLY_KEY] = True
+            stmt = sa.select(User.name).where(User.id == 1).with_for_update()
+            assert await query(dbsession).one(stmt) == "primary"
+            assert await _read_name(dbsession) == "primary"
+
+    async def test_connection_without_statement_uses_primary(
+        self, routing_session_maker: async_sessionmaker[AsyncSession]
+    ) -> None:
+        async with routing_session_maker() as dbsession:
+            dbsession.info[READ_ONLY_KEY] = True
+            connection = await dbsession.connection()
+            assert connection.engine.sync_engine is dbsession.sync_session.bind
+
+
+def test_is_replica_request() -> None:
+    async def endpoint() -> None: ...
+
+    assert is_replica_request({"type": "http", "method": "GET"})
+    assert is_replica_request({"type": "http", "method": "HEAD"})
+    assert not is_replica_request({"type": "http", "method": "POST"})
+    assert not is_replica_request({"type": "websocket"})
+    assert is_replica_request({"type": "http", "method": "POST", "endpoint": use_replica(endpoint)})
+    assert not is_replica_request({"type": "http", "method": "GET", "endpoint": use_primary(endpoint)})
+
+
+@pytest.mark.parametrize("lazy", [True, False])
+@pytest.mark.parametrize("method, expected", [("GET", "replica"), ("POST", "primary")])
+async def test_middleware_routes_by_method(
+    routing_session_maker: async_sessionmaker[AsyncSession], lazy: bool, method: str, expected: str
+) -> None:
+    names: list[str] = []
+
+    async def app(scope: Scope, receive: Receive, send: Send) -> None:
+        names.append(await _read_name(scope["state"]["dbsession"]))
+
+    async def receive() -> Message:
+        return {"type": "http.request", "body": b""}
+
+    async def send(message: Message) -> None: ...
+
+    middleware = DbSessionMiddleware(app, routing_session_maker, lazy=lazy)
+    await middleware({"type": "http", "method": method}, receive, send)
+    assert names == [expected]
@@ -0,0 +1,123 @@
+import datetime
+import decimal
+import json
+import typing
+import uuid
+
+import pytest
+import sqlalchemy as sa
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only
+
+from starlette_sqlalchemy import serialization
+from starlette_sqlalchemy.collection import Collection
+from starlette_sqlalchemy.pagination import KeysetPage, Page, PageNumberPaginator
+from starlette_sqlalchemy.query import query
+from starlette_sqlalchemy.serialization import dumps, get_extractor, ModelJSONResponse
+from tests.models import User
+
+
+@pytest.fixture(params=["orjson", "json"])
+def backend(request: pytest.FixtureRequest, monkeypatch: pytest.MonkeyPatch) -> str:
+    if request.param == "orjson":
+        pytest.importorskip("orjson")
+    else:
+        monkeypatch.setattr(serialization, "orjson", None)
+    return typing.cast(str, request.param)
+
+
+def test_get_extractor_is_cached() -> None:
+    extractor = get_extractor(User)
+    assert extractor is not None
+    assert extractor is get_extractor(User)
+    assert extractor(User(id=1, name="a", email="b")) == {"id": 1, "name": "a", "email": "b"}
+
+
+async def test_dumps_skips_deferred_attributes(dbsession: AsyncSession) -> None:
+    dbsession.expunge_all()
+    user = await query(dbsession).one(sa.select(User).options(load_only(User.name)).where(User.id == 1))
+    assert json.loads(dumps(user)) == {"id": 1, "name": "user_01"}
+
+
+async def test_dumps_skips_expired_attributes(dbsession: AsyncSession) -> None:
+    user = await query(dbsession).one(sa.select(User).where(User.id == 1))
+    dbsession.expire(user, ["email"])
+    assert json.loads(dumps(user)) == {"id": 1, "name": "user_01"}
+
+    dbsession.expire(user)
+    assert json.loads(dumps(user)) == {}
+
+
+def test_get_extractor_for_unmapped_class() -> None:
+    assert get_extractor(dict) is None
+
+
+async def test_dumps_collection(dbsession: AsyncSession, backend: str) -> None:
+    users = await query(dbsession).all(sa.select(User).where(User.id < 3))
+    assert json.loads(dumps(users)) == [
+        {"id": 1, "name": "user_01", "email": "01@user"},
+        {"id": 2, "name": "user_02", "email": "02@user"},
+    ]
+
+
+async def test_dumps_rows(dbsession: AsyncSession, backend: str) -> None:
+    rows = await query(dbsession).values(sa.select(User).where(User.id == 1), User.id, User.name)
+    mappings = await query(dbsession).mappings(sa.select(User.id).where(User.id == 1))
+    assert json.loads(dumps({"rows": rows, "mappings": mappings})) == {
+        "rows": [{"id": 1, "name": "user_01"}],
+        "mappings": [{"id": 1}],
+    }
+
+
+async def test_dumps_page(dbsession: AsyncSession, backend: str) -> None:
+    page = await PageNumberPaginator(dbsession).paginate(sa.select(User), page=2, page_size=4)
+    data = json.loads(dumps(page))
+    assert [item["id"] for item in data["items"]] == [5, 6, 7, 8]
+    assert data["total"] == 9
+    assert data["page"] == 2
+    assert data["total_pages"] == 3
+    assert data["has_next"] is True
+    assert data["has_previous"] is True
+
+
+def test_dumps_keyset_page(backend: str) -> None:
+    page = KeysetPage([1, 2], page_size=2, next_cursor="abc")
+    assert json.loads(dumps(page)) == {
+        "items": [1, 2],
+        "page_size": 2,
+        "next_cursor": "abc",
+        "previous_cursor": None,
+        "has_next": True,
+        "has_previous": False,
+    }
+
+
+def test_dumps_values(backend: str) -> None:
+    value = {
+        "date": datetime.date(2024, 1, 2),
+        "decimal": decimal.Decimal("1.50"),
+        "uuid": uuid.UUID(int=1),
+        "view": Collection([1, 2, 3]).view()[1:],
+        1: "int key",
+    }
+    assert json.loads(dumps(value)) == {
+        "date": "2024-01-02",
+        "decimal": "1.50",
+        "uuid": "00000000-0000-0000-0000-000000000001",
+        "view": [2, 3],
+        "1": "int key",
+    }
+
+
+def test_dumps_unsupported_value(backend: str) -> None:
+    with pytest.raises(TypeError):
+        dumps(object())
+    assert dumps([Page([], total=0, page=1, page_size=1)], default=str).startswith(b"[{")
+    assert dumps(object, default=lambda _: "x") == b'"x"'
+
+
+async def test_json_response(dbsession: AsyncSession) -> None:
+    users = await query(dbsession).all(sa.select(User).where(User.id == 1))
+    response = ModelJSONResponse(users)
+    assert json.loads(response.body) == [{"id": 1, "name": "user_01", "email": "01@user"}]
+    assert response.media_type == "application/json"
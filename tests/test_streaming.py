@@ -0,0 +1,135 @@
+import anyio
+import pytest
+import sqlalchemy as sa
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.types import Message
+
+from starlette_sqlalchemy.query import query
+from starlette_sqlalchemy.repos import Repo, RepoFilter
+from starlette_sqlalchemy.streaming import (
+    csv_lines,
+    CSVResponse,
+    get_row_mode,
+    ndjson_lines,
+    NDJSONResponse,
+    QueryStreamingResponse,
+    to_record,
+)
+from tests.models import User
+
+
+class UserRepo(Repo[User]):
+    model_class = User
+
+
+class IdBelow(RepoFilter[User]):
+    def __init__(self, value: int) -> None:
+        self.value = value
+
+    def apply(self, stmt: sa.Select[tuple[User]]) -> sa.Select[tuple[User]]:
+        return stmt.where(User.id < self.value)
+
+
+async def receive() -> Message:  # pragma: no cover
+    await anyio.Event().wait()
+    return {"type": "http.disconnect"}
+
+
+async def send_response(response: QueryStreamingResponse) -> list[Message]:
+    messages: list[Message] = []
+
+    async def send(message: Message) -> None:
+        messages.append(message)
+
+    await response({"type": "http", "asgi": {"spec_version": "2.4"}}, receive, send)
+    return messages
+
+
+async def test_to_record(dbsession: AsyncSession) -> None:
+    user = await query(dbsession).one(sa.select(User).where(User.id == 1))
+    assert to_record(user) == {"id": 1, "name": "user_01", "email": "01@user"}
+    assert to_record({"id": 1}) == {"id": 1}
+    assert to_record(1) == 1
+
+
+async def test_ndjson_lines(dbsession: AsyncSession) -> None:
+    stmt = sa.select(User).limit(2)
+    lines = [line async for line in ndjson_lines(query(dbsession).iterator(stmt))]
+    assert lines == [
+        b'{"id":1,"name":"user_01","email":"01@user"}\n',
+        b'{"id":2,"name":"user_02","email":"02@user"}\n',
+    ]
+
+
+async def test_ndjson_lines_tuples(dbsession: AsyncSession) -> None:
+    stmt = sa.select(User.id, User.name).limit(1)
+    lines = [line async for line in ndjson_lines(query(dbsession).iterator(stmt, rows="tuples"))]
+    assert lines == [b'{"id":1,"name":"user_01"}\n']
+
+
+async def test_csv_lines(dbsession: AsyncSession) -> None:
+    stmt = sa.select(User.id, User.name).limit(2)
+    lines = [line async for line in csv_lines(query(dbsession).iterator(stmt, rows="mappings"))]
+    assert b"".join(lines) == b"id,name\r\n1,user_01\r\n2,user_02\r\n"
+
+
+async def test_csv_lines_without_header(dbsession: AsyncSession) -> None:
+    stmt = sa.select(User.id).limit(2)
+    lines = [line async for line in csv_lines(query(dbsession).iterator(stmt), header=False)]
+    assert lines == [b"1\r\n", b"2\r\n"]
+
+
+def test_get_row_mode() -> None:
+    assert get_row_mode(sa.select(User)) == "scalars"
+    assert get_row_mode(sa.select(User.id)) == "mappings"
+    assert get_row_mode(sa.select(User, User.id)) == "mappings"
+
+
+def test_base_response_is_abstract(dbsession: AsyncSession) -> None:
+    with pytest.raises(TypeError):
+        QueryStreamingResponse(dbsession, sa.select(User))  # type: ignore[abstract]
+
+
+class TestNDJSONResponse:
+    async def test_streams_partitions(self, dbsession: AsyncSession) -> None:
+        response = NDJSONResponse(dbsession, sa.select(User.id, User.name).limit(3), batch_size=2)
+        messages = await send_response(response)
+        assert messages[0]["type"] == "http.response.start"
+        assert (b"content-type", b"application/x-ndjson") in messages[0]["headers"]
+        assert [message["body"] for message in messages[1:]] == [
+            b'{"id":1,"name":"user_01"}\n{"id":2,"name":"user_02"}\n',
+            b'{"id":3,"name":"user_03"}\n',
+            b"",
+        ]
+
+    async def test_expunges_objects(self, dbsession: AsyncSession) -> None:
+        loaded = len(dbsession.identity_map)
+        response = NDJSONResponse(dbsession, sa.select(User).limit(2))
+        await send_response(response)
+        assert len(dbsession.identity_map) == loaded - 2
+
+    async def test_from_repo(self, dbsession: AsyncSession) -> None:
+        response = NDJSONResponse.from_repo(UserRepo(dbsession), IdBelow(3), expunge=False)
+        messages = await send_response(response)
+        assert messages[1]["body"] == (
+            b'{"id":1,"name":"user_01","email":"01@user"}\n{"id":2,"name":"user_02","email":"02@user"}\n'
+        )
+
+
+class TestCSVResponse:
+    async def test_streams_csv(self, dbsession: AsyncSession) -> None:
+        response = CSVResponse(dbsession, sa.select(User.id, User.name).limit(3), batch_size=2, filename="users.csv")
+        messages = await send_response(response)
+        headers = dict(messages[0]["headers"])
+        assert headers[b"content-type"] == b"text/csv; charset=utf-8"
+        assert headers[b"content-disposition"] == b"attachment; filename*=utf-8''users.csv"
+        assert [message["body"] for message in messages[1:]] == [
+            b"id,name\r\n1,user_01\r\n2,user_02\r\n",
+            b"3,user_03\r\n",
+            b"",
+        ]
+
+    async def test_from_repo_without_filter(self, dbsession: AsyncSession) -> None:
+        response = CSVResponse.from_repo(UserRepo(dbsession))
+        messages = await send_response(response)
+        assert messages[1]["body"].count(b"\r\n") == 10